@@ -0,0 +1,75 @@
+"""
+Measures the cost of loading sqlglot in a fresh interpreter using `python -X importtime`.
+
+Every scenario runs in its own interpreter, the reported time is the median over all
+runs of the imports triggered by the scenario, interpreter startup excluded. The script
+exits with a non-zero status if a scenario exceeds its budget.
+
+    python benchmarks/import_time.py [--runs N] [--scale FACTOR]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+# scenario -> (code, budget in milliseconds)
+SCENARIOS = {
+    "import": ("import sqlglot", 5),
+    "parse": ("import sqlglot; sqlglot.parse_one('SELECT a FROM x')", 60),
+    "transpile": ("import sqlglot; sqlglot.transpile('SELECT a FROM x', write='spark')", 60),
+}
+
+
+def import_times(code):
+    env = {k: v for k, v in os.environ.items() if k != "PYTHONDONTWRITEBYTECODE"}
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # top level imports only, their cumulative time includes the nested ones
+        if cumulative.strip().isdigit() and not name[1:].startswith(" "):
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def measure(code, runs):
+    startup = set(import_times("pass"))
+    totals = []
+    for _ in range(runs):
+        times = import_times(code)
+        totals.append(sum(t for name, t in times.items() if name not in startup) / 1000)
+    return statistics.median(totals)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the import time of sqlglot")
+    parser.add_argument("--runs", type=int, default=10, help="runs per scenario")
+    parser.add_argument("--scale", type=float, default=1.0, help="factor applied to the budgets")
+    args = parser.parse_args()
+
+    # warm up the bytecode cache so that compilation isn't measured
+    import_times(SCENARIOS["transpile"][0])
+
+    over_budget = False
+    for name, (code, budget) in SCENARIOS.items():
+        median = measure(code, args.runs)
+        budget *= args.scale
+        status = "ok" if median <= budget else "OVER BUDGET"
+        over_budget = over_budget or median > budget
+        print(f"{name:<10} {median:8.2f}ms  (budget {budget:.0f}ms)  {status}")
+
+    sys.exit(1 if over_budget else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -21,6 +21,7 @@ setup(
     author_email="daniel.d.kang@gmail.com",
     license="MIT",
     packages=["sqlglot"],
+    extras_require={"flat": ["numpy"]},
     classifiers=[
         "Development Status :: 5 - Production/Stable",
         "Intended Audience :: Developers",
@@ -1,13 +1,54 @@
-from sqlglot.dialects import Dialect
-from sqlglot.errors import ErrorLevel, UnsupportedError, ParseError, TokenError
-from sqlglot.expressions import Expression
-from sqlglot.generator import Generator
-from sqlglot.tokens import Tokenizer, TokenType
-from sqlglot.parser import Parser
+import importlib
+
+# typing isn't imported for its flag, it alone takes longer to import than this package
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    # the lazily imported names, which tools reading the package statically don't see otherwise
+    from sqlglot.canonical import canonicalize
+    from sqlglot.dialects import Dialect
+    from sqlglot.errors import ErrorLevel, UnsupportedError, ParseError, TokenError
+    from sqlglot.expressions import Expression
+    from sqlglot.fingerprints import fingerprint
+    from sqlglot.generator import Generator
+    from sqlglot.parser import Parser
+    from sqlglot.tokens import Tokenizer, TokenType
+    from sqlglot.transpiler import Transpiler
 
 
 __version__ = "1.28.1"
 
+# The public names below are imported on first access rather than with the package,
+# so that `import sqlglot` doesn't pay for loading the dialects, the parser and the
+# generator until they are needed.
+_LAZY_ATTRS = {
+    "Dialect": "sqlglot.dialects",
+    "ErrorLevel": "sqlglot.errors",
+    "UnsupportedError": "sqlglot.errors",
+    "ParseError": "sqlglot.errors",
+    "TokenError": "sqlglot.errors",
+    "Expression": "sqlglot.expressions",
+    "Generator": "sqlglot.generator",
+    "Tokenizer": "sqlglot.tokens",
+    "TokenType": "sqlglot.tokens",
+    "Parser": "sqlglot.parser",
+    "fingerprint": "sqlglot.fingerprints",
+    "canonicalize": "sqlglot.canonical",
+    "Transpiler": "sqlglot.transpiler",
+}
+
+
+def __getattr__(name):
+    module = _LAZY_ATTRS.get(name)
+    if module is None:
+        raise AttributeError(f"module 'sqlglot' has no attribute '{name}'")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted({*globals(), *_LAZY_ATTRS})
+
 
 def parse(code, read=None, **opts):
     """
@@ -23,6 +64,8 @@ def parse(code, read=None, **opts):
     Returns
         the list of parsed syntax trees.
     """
+    from sqlglot.dialects import Dialect
+
     dialect = Dialect.get_or_raise(read)()
     return dialect.parse(code, **opts)
 
@@ -50,22 +93,43 @@ def transpile(code, read=None, write=None, identity=True, error_level=None, **op
     transformed to conform to the target dialect. Each string in the returned list represents
     a single transformed SQL statement.
 
+    Several target dialects can be given at once, the SQL string is then only parsed once and
+    the SQL of the subtrees that all the target dialects generate the same way is only
+    generated once, see :func:`~sqlglot.generator.share_memo`.
+
+    Example:
+        >>> transpile("SELECT CAST(a AS TEXT) FROM x", write=["spark", "presto"])
+        {'spark': ['SELECT CAST(a AS STRING) FROM x'], 'presto': ['SELECT CAST(a AS VARCHAR) FROM x']}
+
     Args
         code (str): the SQL code string to transpile.
         read (str): the source dialect used to parse the input string
             (eg. "spark", "hive", "presto", "mysql").
-        write (str): the target dialect into which the input should be transformed
-            (eg. "spark", "hive", "presto", "mysql").
+        write (str|list): the target dialect into which the input should be transformed
+            (eg. "spark", "hive", "presto", "mysql"), or a list of target dialects.
         identity (bool): if set to True and if the target dialect is not specified
             the source dialect will be used as both: the source and the target dialect.
         error_level (ErrorLevel): the desired error level of the parser.
         opts (dict): other options.
 
     Returns
-        the list of transpiled SQL statements / expressions.
+        the list of transpiled SQL statements / expressions, or a dictionary from each target
+        dialect to its list if a list of target dialects is given.
     """
+    from sqlglot.dialects import Dialect
+    from sqlglot.generator import share_memo
+
     write = write or read if identity else write
-    return [
-        Dialect.get_or_raise(write)().generate(expression, **opts)
-        for expression in parse(code, read, error_level=error_level)
-    ]
+    expressions = parse(code, read, error_level=error_level)
+
+    if not isinstance(write, (list, tuple)):
+        dialect = Dialect.get_or_raise(write)()
+        return [dialect.generate(expression, **opts) for expression in expressions]
+
+    generators = share_memo(
+        Dialect.get_or_raise(w)().generator(**{**opts, "memoize": True}) for w in write
+    )
+    return {
+        w: [generator.generate(expression) for expression in expressions]
+        for w, generator in zip(write, generators)
+    }
@@ -0,0 +1,341 @@
+# pylint: disable=protected-access
+from hashlib import blake2b
+
+import sqlglot.expressions as exp
+from sqlglot.rules import Pattern, Rule, RuleSet
+
+# operators whose operands can be reordered, the associative ones are also flattened
+COMMUTATIVE = (exp.And, exp.Or, exp.Add, exp.Mul, exp.EQ, exp.NEQ)
+ASSOCIATIVE = (exp.And, exp.Or, exp.Add, exp.Mul)
+
+# The binding strength of the operators on which SQL and the parser agree. AND and OR are
+# parsed with the same precedence, the operators which are missing are never unwrapped.
+PRECEDENCE = {
+    exp.And: 1,
+    exp.Or: 1,
+    exp.EQ: 2,
+    exp.NEQ: 2,
+    exp.GT: 2,
+    exp.GTE: 2,
+    exp.LT: 2,
+    exp.LTE: 2,
+    exp.Is: 2,
+    exp.Like: 2,
+    exp.Add: 3,
+    exp.Sub: 3,
+    exp.Mul: 4,
+    exp.Div: 4,
+    exp.IntDiv: 4,
+}
+
+# levels whose operators are left associative, so (a - b) + c is a - b + c
+LEFT_ASSOCIATIVE = {3, 4}
+
+# expressions which never need parentheses to be parsed as a single operand
+ATOMS = (
+    exp.Column,
+    exp.Literal,
+    exp.Identifier,
+    exp.Func,
+    exp.Star,
+    exp.Null,
+    exp.Boolean,
+    exp.Cast,
+    exp.Case,
+    exp.Paren,
+    exp.Tuple,
+)
+
+# expressions whose arguments are delimited by the syntax, so parentheses around them
+# are redundant unless they introduce a subquery
+DELIMITED = (
+    exp.Select,
+    exp.Where,
+    exp.Having,
+    exp.Alias,
+    exp.Ordered,
+    exp.Join,
+    exp.Func,
+    exp.Paren,
+    exp.Tuple,
+    exp.Group,
+)
+
+QUERIES = (exp.Select, exp.Union, exp.Intersect, exp.Except, exp.CTE)
+
+
+def canonicalize(expression, copy=True):
+    """
+    Rewrites a syntax tree into a deterministic normal form, so that queries which only differ
+    cosmetically have the same SQL and the same hash, eg. to be used as a result cache key.
+
+    - Table and CTE aliases are renamed to _t0, _t1, ... in order of appearance, along with the
+      references to them, and the aliases of the outermost projections to _c0, _c1, ... by
+      position. Aliases which are also the name of a table are left as is.
+    - Parentheses are removed where the precedence of the operators allows it.
+    - The operands of AND, OR, +, * (which are also flattened) and of = and <> are sorted by a
+      structural digest which, unlike the hash of the expressions, is stable across processes.
+      The sorted operands are parenthesized wherever they would otherwise bind differently,
+      eg. z OR y AND x becomes (y OR z) AND x.
+
+    Example:
+        >>> canonicalize(sqlglot.parse_one("SELECT x.b AS c FROM t AS x WHERE (x.a = 1)")).sql()
+        'SELECT _t0.b AS _c0 FROM t AS _t0 WHERE _t0.a = 1'
+
+    Args
+        expression (Expression): the syntax tree.
+        copy (bool): if set to True the tree is copied first, otherwise it is modified in place.
+            The root may still be replaced, so the returned tree must be used either way.
+
+    Returns
+        the canonical tree.
+    """
+    expression = expression.copy() if copy else expression.unshare()
+    _rename_aliases(expression)
+    return _rules().apply(expression, copy=False, fixpoint=True)
+
+
+def _rules():
+    digests = {}
+
+    def sort_key(node):
+        return _digest(node, digests)
+
+    def strip_parens(node):
+        # ORDER BY (1) sorts by a constant while ORDER BY 1 refers to the first projection
+        positional = isinstance(node, (exp.Ordered, exp.Group))
+        new_args = {}
+        for k, v in node._arg_items():
+            if isinstance(v, list):
+                unwrapped = [_strip(c, positional) for c in v]
+                if any(a is not b for a, b in zip(unwrapped, v)):
+                    new_args[k] = unwrapped
+            elif isinstance(v, exp.Paren):
+                unwrapped = _strip(v, positional)
+                if unwrapped is not v:
+                    new_args[k] = unwrapped
+        return _with_args(node, new_args) if new_args else None
+
+    def normalize_binary(node):
+        cls = node.__class__
+        if cls in ASSOCIATIVE and node.parent.__class__ is cls:
+            # the whole chain is normalized at its root
+            return None
+
+        if cls in COMMUTATIVE:
+            if cls in ASSOCIATIVE:
+                current, operands = _chain(node), _flatten(node)
+            else:
+                current = operands = [node.this, node.args["expression"]]
+            operands = sorted((_unwrap(o, cls, False) for o in operands), key=sort_key)
+            if len(operands) == len(current) and all(a is b for a, b in zip(operands, current)):
+                return None
+            # the operands are unwrapped as right operands above, they're wrapped back the same
+            # way since an operand moved to the right may otherwise bind differently
+            operands = [_wrap(o, cls) for o in operands]
+            result = operands[0]
+            for operand in operands[1:]:
+                result = _binary(cls, result, operand)
+            return result
+
+        this = _unwrap(node.this, cls, True)
+        expression = _unwrap(node.args["expression"], cls, False)
+        if this is node.this and expression is node.args["expression"]:
+            return None
+        return _binary(cls, this, expression)
+
+    return RuleSet(
+        Rule(Pattern(DELIMITED), strip_parens),
+        Rule(
+            Pattern(exp.Binary, this=exp.Expression, expression=exp.Expression),
+            normalize_binary,
+        ),
+    )
+
+
+def _strip(node, positional):
+    while isinstance(node, exp.Paren):
+        inner = node.this
+        if isinstance(inner, QUERIES) or (positional and isinstance(inner, exp.Literal)):
+            break
+        node = inner
+    return node
+
+
+def _unwrap(node, parent_class, left):
+    """Removes the parentheses around an operand of a binary operator if they're redundant."""
+    while isinstance(node, exp.Paren) and not _needs_parens(node.this, parent_class, left):
+        node = node.this
+    return node
+
+
+def _wrap(node, parent_class):
+    """Adds parentheses around a right operand of a binary operator if it needs them."""
+    # the other expressions, eg. NOT, IN or BETWEEN, bind tighter than the sorted operators
+    if not isinstance(node, exp.Binary) or not _needs_parens(node, parent_class, False):
+        return node
+    paren = exp.Paren(this=node)
+    paren._set_parent("this", node)
+    return paren
+
+
+def _needs_parens(node, parent_class, left):
+    if isinstance(node, ATOMS):
+        return False
+    parent_level = PRECEDENCE.get(parent_class)
+    level = PRECEDENCE.get(node.__class__)
+    if parent_level is None or level is None:
+        return True
+    if level < parent_level:
+        return True
+    return level == parent_level and not (
+        (left and level in LEFT_ASSOCIATIVE)
+        or (node.__class__ is parent_class and parent_class in ASSOCIATIVE)
+    )
+
+
+def _flatten(node):
+    """Returns the operands of a chain of the same operator, looking through parentheses."""
+    cls = node.__class__
+    operands = []
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        while isinstance(current, exp.Paren) and current.this.__class__ is cls:
+            current = current.this
+        if current.__class__ is cls:
+            stack.append(current.args["expression"])
+            stack.append(current.this)
+        else:
+            operands.append(current)
+    return operands
+
+
+def _chain(node):
+    """Returns the operands of a left deep chain of the same operator, as it is."""
+    cls = node.__class__
+    operands = []
+    while node.__class__ is cls:
+        operands.append(node.args["expression"])
+        node = node.this
+    operands.append(node)
+    operands.reverse()
+    return operands
+
+
+def _binary(cls, this, expression):
+    node = cls(this=this, expression=expression)
+    node._set_parent("this", this)
+    node._set_parent("expression", expression)
+    return node
+
+
+def _with_args(node, new_args):
+    args = dict(node._arg_items())
+    args.update(new_args)
+    new_node = node.__class__(**args)
+    for k, v in args.items():
+        new_node._set_parent(k, v)
+    return new_node
+
+
+def _digest(value, digests):
+    if isinstance(value, exp.Expression):
+        cached = digests.get(id(value))
+        if cached is not None:
+            return cached[1]
+
+        digest = blake2b(value.key.encode("utf-8"), digest_size=16)
+        for k, v in value._arg_items():
+            digest.update(b"\0" + k.encode("utf-8") + b"\0")
+            digest.update(_digest(v, digests))
+        digest = digest.digest()
+        # the node is kept alive so that its id isn't reused during the rewrite
+        digests[id(value)] = (value, digest)
+        return digest
+
+    if isinstance(value, (list, tuple)):
+        digest = blake2b(b"list", digest_size=16)
+        for v in value:
+            digest.update(_digest(v, digests))
+        return digest.digest()
+
+    return blake2b(f"{type(value).__name__}:{value}".encode("utf-8"), digest_size=16).digest()
+
+
+def _name_key(identifier):
+    if isinstance(identifier, exp.Identifier):
+        name = identifier.this
+        return name if identifier.args.get("quoted") else name.lower()
+    return identifier.lower() if isinstance(identifier, str) else None
+
+
+def _rename(identifier, name):
+    if isinstance(identifier, exp.Identifier):
+        identifier.replace(exp.Identifier(this=name, quoted=False))
+
+
+def _rename_aliases(expression):
+    cte_aliases = [
+        alias.args.get("alias")
+        for cte in expression.find_all(exp.CTE)
+        for alias in cte.args["expressions"]
+    ]
+    table_aliases = [
+        alias.args.get("alias")
+        for alias in expression.find_all(exp.Alias)
+        if isinstance(alias.parent, (exp.From, exp.Join))
+    ]
+    cte_names = {_name_key(alias) for alias in cte_aliases}
+    table_names = {_name_key(table.this) for table in expression.find_all(exp.Table)} - cte_names
+
+    names = {}
+    for alias in cte_aliases + table_aliases:
+        key = _name_key(alias)
+        if key is None or key in table_names:
+            continue
+        if key not in names:
+            names[key] = f"_t{len(names)}"
+        _rename(alias, names[key])
+
+    if names:
+        for column in list(expression.find_all(exp.Column)):
+            name = names.get(_name_key(column.args.get("table")))
+            if name:
+                _rename(column.args["table"], name)
+        for table in list(expression.find_all(exp.Table)):
+            key = _name_key(table.this)
+            if key in cte_names and not table.args.get("db") and key in names:
+                _rename(table.this, names[key])
+
+    _rename_projections(expression)
+
+
+def _rename_projections(expression):
+    select = expression.this if isinstance(expression, exp.CTE) else expression
+    if not isinstance(select, exp.Select):
+        return
+
+    order = select.args.get("order")
+    # a name which is used anywhere but in ORDER BY, eg. in GROUP BY or HAVING, may refer to
+    # the alias or to a column of the same name, so the aliases of that name are kept
+    referenced = {
+        _name_key(column.this)
+        for column in select.find_all(exp.Column, prune=lambda node, *_: node is order)
+        if not column.args.get("table")
+    }
+
+    projections = {}
+    for i, projection in enumerate(select.args.get("expressions") or []):
+        if isinstance(projection, exp.Alias) and projection.args.get("alias"):
+            key = _name_key(projection.args["alias"])
+            if key in referenced:
+                continue
+            projections[key] = f"_c{i}"
+            _rename(projection.args["alias"], f"_c{i}")
+
+    if projections and order:
+        for column in list(order.find_all(exp.Column)):
+            name = projections.get(_name_key(column.this))
+            if name and not column.args.get("table"):
+                _rename(column.this, name)
@@ -1,14 +1,45 @@
 # pylint: disable=no-member, protected-access
+from functools import lru_cache
+
 import sqlglot.constants as c
 import sqlglot.expressions as exp
 from sqlglot.generator import Generator
 from sqlglot.helper import RegisteringMeta, csv, list_get
 from sqlglot.parser import Parser
-from sqlglot.time import format_time
+from sqlglot.time import MAX_FORMATS, translator
 from sqlglot.tokens import Tokenizer
 from sqlglot.trie import new_trie
 
 
+@lru_cache(maxsize=MAX_FORMATS)
+def _time_literal(time_translator, string):
+    # the literal is shared by the trees which use the format, as an interned node is,
+    # so it isn't built again for every call
+    return exp.DEFAULT_INTERNER.intern(exp.Literal.string(time_translator.translate(string)))
+
+
+class _TimeTable:
+    """
+    A class attribute derived from the dialect's time_mapping. The tables of a dialect
+    are built the first time one of them is accessed rather than when it's defined.
+    """
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        tables = owner.__dict__.get("_time_tables")
+        if tables is None:
+            inverse_time_mapping = {v: k for k, v in owner.time_mapping.items()}
+            tables = {
+                "time_trie": new_trie(owner.time_mapping),
+                "inverse_time_mapping": inverse_time_mapping,
+                "inverse_time_trie": new_trie(inverse_time_mapping),
+            }
+            owner._time_tables = tables
+        return tables[self.name]
+
+
 class Dialect(metaclass=RegisteringMeta):
     identifier = None
     quotes = None
@@ -23,9 +54,9 @@ class Dialect(metaclass=RegisteringMeta):
 
     time_mapping = {}
     # automatically created
-    time_trie = None
-    inverse_time_mapping = None
-    inverse_time_trie = None
+    time_trie = _TimeTable()
+    inverse_time_mapping = _TimeTable()
+    inverse_time_trie = _TimeTable()
 
     @classmethod
     def get_or_raise(cls, dialect):
@@ -39,29 +70,29 @@ class Dialect(metaclass=RegisteringMeta):
     @classmethod
     def format_time(cls, expression):
         if isinstance(expression, str):
-            return exp.Literal.string(
-                format_time(
-                    expression[1:-1],  # the time formats are quoted
-                    cls.time_mapping,
-                    cls.time_trie,
-                )
-            )
+            # the time formats are quoted
+            return _time_literal(translator(cls.time_mapping, cls.time_trie), expression[1:-1])
         if isinstance(expression, exp.Literal) and expression.is_string:
-            return exp.Literal.string(
-                format_time(
-                    expression.this,
-                    cls.time_mapping,
-                    cls.time_trie,
-                )
-            )
+            return _time_literal(translator(cls.time_mapping, cls.time_trie), expression.this)
         return expression
 
     def parse(self, code, **opts):
         return self.parser(**opts).parse(self.tokenizer().tokenize(code), code)
 
+    def parse_into(self, expression_type, code, **opts):
+        return self.parser(**opts).parse_into(
+            expression_type, self.tokenizer().tokenize(code), code
+        )
+
     def generate(self, expression, **opts):
         return self.generator(**opts).generate(expression)
 
+    def generate_iter(self, expression, **opts):
+        return self.generator(**opts).generate_iter(expression)
+
+    def generate_to(self, expression, writer, **opts):
+        self.generator(**opts).generate_to(expression, writer)
+
     def transpile(self, code, **opts):
         return self.generate(self.parse(code), **opts)
 
@@ -129,7 +160,8 @@ def _no_ilike_sql(self, expression):
 def _no_recursive_cte_sql(self, expression):
     if expression.args.get("recursive"):
         self.unsupported("Recursive CTEs are unsupported")
-        expression.args["recursive"] = False
+        expression = expression.copy()
+        expression.set("recursive", False)
     return self.cte_sql(expression)
 
 
@@ -347,13 +379,16 @@ class Hive(Dialect):
             if isinstance(p.args["value"], exp.Schema):
                 partitioned_by = p
 
+        expression.set(
+            "expressions",
+            [p for p in properties if p is not partitioned_by and p is not stored_as],
+        )
+
         if partitioned_by:
-            properties.remove(partitioned_by)
             partitioned_by = self.seg(
                 f"PARTITIONED BY {self.sql(partitioned_by.args['value'])}"
             )
         if stored_as:
-            properties.remove(stored_as)
             stored_as = self.seg(f"STORED AS {stored_as.text('value').upper()}")
 
         return (
@@ -555,7 +590,8 @@ class Presto(Dialect):
         for schema in expression.parent.find_all(exp.Schema):
             if isinstance(schema.parent, exp.Property):
                 expression = expression.copy()
-                expression.args["expressions"].extend(schema.args["expressions"])
+                for column in schema.args["expressions"]:
+                    expression.append("expressions", column.copy())
 
         return self.schema_sql(expression)
 
@@ -739,9 +775,3 @@ class Oracle(Dialect):
         exp.DataType.Type.DECIMAL: "NUMBER",
         exp.DataType.Type.VARCHAR: "VARCHAR2",
     }
-
-
-for d in Dialect.classes.values():
-    d.time_trie = new_trie(d.time_mapping)
-    d.inverse_time_mapping = {v: k for k, v in d.time_mapping.items()}
-    d.inverse_time_trie = new_trie(d.inverse_time_mapping)
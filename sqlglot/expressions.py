@@ -1,11 +1,164 @@
+# pylint: disable=protected-access
+from collections import deque
+from collections.abc import MutableMapping
+import heapq
+from operator import attrgetter
+from weakref import ReferenceType, WeakValueDictionary, ref
 from enum import auto
-import inspect
-import sys
+import re
 
-from sqlglot.helper import AutoName, camel_to_snake_case, ensure_list
+from sqlglot.helper import AutoName, RegisteringMeta, camel_to_snake_case, ensure_list
+from sqlglot.tokens import Tokenizer
 
+_NAME_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+_JOIN_KEYWORDS = {"JOIN", "LEFT", "RIGHT", "FULL", "INNER", "OUTER", "CROSS"}
+_WEAK_PARENTS = False
+_MISSING = object()
 
-class Expression:
+
+class _Unreachable:
+    pass
+
+
+# the parent of shared nodes, a reference which reads as no parent
+_SHARED = ref(_Unreachable())
+
+
+def set_weak_parents(enabled=True):
+    """
+    Sets whether the parent links created from now on are weak references.
+
+    Parent links make every tree a web of reference cycles, so dropping a tree leaves
+    it to the cyclic garbage collector. With weak parent links a tree is freed by
+    reference counting as soon as its root is dropped. In exchange a node only knows
+    its parent as long as something else keeps the parent alive, so a subtree which
+    outlives its root reports no parent. Existing links are left as they are.
+
+    Args:
+        enabled (bool): whether to create weak parent links.
+    """
+    global _WEAK_PARENTS  # pylint: disable=global-statement
+    _WEAK_PARENTS = enabled
+
+
+def _init_args(node, args):
+    # Compiles the initializer of the argument slots of the class on its first instance and
+    # replaces this one with it. Assigning each slot by name in generated code is about twice
+    # as fast as a setattr loop, and compiling lazily keeps the classes which aren't used
+    # from slowing down the import.
+    cls = node.__class__
+    lines = [f"    node.{slot} = args.pop({k!r}, None)" for k, slot in cls._arg_slots.items()]
+    lines.append("    node._extra = ({k: v for k, v in args.items() if v is not None} or None) if args else None")
+    namespace = {}
+    exec("\n".join(["def _init_args(node, args):", *lines]), namespace)  # pylint: disable=exec-used
+    cls._init_args = namespace["_init_args"]
+    cls._init_args(node, args)
+
+
+class _Expression(RegisteringMeta):
+    """
+    Registers every expression class by its key (the lower cased class name) and
+    assigns it a process-wide integer id, which compact tree representations use
+    to refer to node classes.
+
+    It also gives every class one slot per argument of its arg_types which isn't
+    inherited already, so nodes store their arguments without a per-instance dict.
+    The slots are prefixed to keep them apart from the properties of the same name.
+    The arguments are stored by an initializer compiled for the class, see _init_args.
+    """
+
+    classes = {}
+    ids = []
+
+    def __new__(mcs, clsname, bases, attrs):
+        inherited = {}
+        for base in bases:
+            inherited.update(getattr(base, "_arg_slots", {}))
+
+        arg_types = attrs.get("arg_types")
+        if arg_types is None:
+            arg_types = next((b.arg_types for b in bases if hasattr(b, "arg_types")), {})
+
+        slots = {k: inherited.get(k, f"_arg_{k}") for k in arg_types}
+        attrs["__slots__"] = tuple(attrs.get("__slots__", ())) + tuple(
+            slot for k, slot in slots.items() if k not in inherited
+        )
+
+        clazz = super().__new__(mcs, clsname, bases, attrs)
+        clazz.key = clsname.lower()
+        clazz._arg_slots = {**slots, **inherited}
+        # reads all the argument slots and _extra in one call, see _arg_items
+        clazz._arg_getter = attrgetter(*clazz._arg_slots.values(), "_extra")
+        clazz._init_args = _init_args
+        clazz.class_id = len(mcs.ids)
+        mcs.ids.append(clazz)
+        return clazz
+
+
+class _Args(MutableMapping):
+    """
+    Dict-like view of the arguments of an expression, which are stored in slots.
+    Only the arguments which are set are listed, reading an absent one raises a
+    KeyError like a dict does. Writes reset the cached hashes up the parent chain
+    but don't set parent links or update a type index.
+    """
+
+    __slots__ = ("node",)
+
+    def __init__(self, node):
+        self.node = node
+
+    def __getitem__(self, key):
+        value = self.node._get_arg(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self.node._ensure_mutable()
+        self.node._set_arg(key, value)
+        self.node._invalidate()
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self[key] = None
+
+    def __contains__(self, key):
+        return self.node._get_arg(key) is not None
+
+    def __iter__(self):
+        return iter([k for k, _ in self.node._arg_items()])
+
+    def __len__(self):
+        return len(self.node._arg_items())
+
+    def __repr__(self):
+        return repr(dict(self.node._arg_items()))
+
+    def get(self, key, default=None):
+        return self.node._get_arg(key, default)
+
+    def setdefault(self, key, default=None):
+        value = self.node._get_arg(key)
+        if value is None:
+            self[key] = value = default
+        return value
+
+    def pop(self, key, default=_MISSING):
+        if key in self:
+            value = self.node._get_arg(key)
+            self[key] = None
+            return value
+        if default is _MISSING:
+            raise KeyError(key)
+        return default
+
+    def items(self):
+        return self.node._arg_items()
+
+
+class Expression(metaclass=_Expression):
     """
     The base class for all expressions in a syntax tree.
 
@@ -15,37 +168,185 @@ class Expression:
             which the argument's value can be retrieved. The value is a boolean
             flag which indiciates whether the argument's value is required (True)
             or optional (False).
+        args (MutableMapping): a dict-like view of the arguments of this expression.
+            An argument set to None is absent.
+        key (str): the key of this class in the expression registry.
+        class_id (int): the id of this class in the expression registry.
+        parent (Expression): the parent node, see :func:`set_weak_parents`.
+        arg_key (str): the key of the argument of the parent under which this node is stored.
+        arg_index (int): the position of this node in the list stored under arg_key, or None
+            if the argument isn't a list.
     """
 
+    # set for every class by the metaclass, see _Expression
+    key = None
+    class_id = None
+    _arg_slots = {}
+    _init_args = _init_args
+
+    @staticmethod
+    def _arg_getter(node):
+        return (node._extra,)
+
     arg_types = {"this": True}
-    __slots__ = ("key", "args", "parent", "arg_key")
+    __slots__ = ("_parent", "arg_key", "arg_index", "_hash", "_sql", "_sql_key", "_index", "_extra", "__weakref__")
 
     def __init__(self, **args):
-        self.key = self.__class__.__name__.lower()
-        self.args = args
-        self.parent = None
+        self._parent = None
         self.arg_key = None
+        self.arg_index = None
+        self._hash = None
+        self._sql = None
+        self._sql_key = None
+        self._index = None
+        self._init_args(args)
 
     def __eq__(self, other):
-        return type(self) is type(other) and _norm_args(self) == _norm_args(other)
+        return (
+            type(self) is type(other)
+            and hash(self) == hash(other)
+            and _norm_args(self) == _norm_args(other)
+        )
 
     def __hash__(self):
-        return hash(
-            (
-                self.key,
-                tuple(
-                    (k, tuple(v) if isinstance(v, list) else v)
-                    for k, v in _norm_args(self).items()
-                ),
+        # The structural hash is computed once and cached, child hashes are cached
+        # as well so computing it is O(1) per node. Mutations that go through the
+        # API (set, append, transform) reset the cache up the parent chain, along
+        # with the SQL memoized by the generator.
+        if self._hash is None:
+            self._hash = hash(
+                (
+                    self.key,
+                    frozenset(
+                        (k, tuple(v) if isinstance(v, list) else v)
+                        for k, v in _norm_args(self).items()
+                    ),
+                )
             )
-        )
+        return self._hash
+
+    def __getstate__(self):
+        # the parent links are left out, weak references can't be pickled, and the links
+        # of the children are rebuilt on load, so an unpickled subtree is detached
+        return self._arg_items(), self.shared
+
+    def __setstate__(self, state):
+        args, shared = state
+        Expression.__init__(self)
+        for k, v in args:
+            self._set_arg(k, v)
+            self._set_parent(k, v)
+        if shared:
+            # the shared children are loaded before their parents, which keeps them unlinked
+            self._parent = _SHARED
+
+    def _replace_args(self, args):
+        self._ensure_mutable()
+        for slot in self._arg_slots.values():
+            setattr(self, slot, None)
+        self._extra = None
+        for k, v in args.items():
+            self._set_arg(k, v)
+        self._invalidate()
+
+    args = property(_Args, _replace_args)
+
+    def _get_arg(self, arg_key, default=None):
+        try:
+            value = getattr(self, self._arg_slots[arg_key])
+        except KeyError:
+            value = self._extra.get(arg_key) if self._extra else None
+        return default if value is None else value
+
+    def _set_arg(self, arg_key, value):
+        """Stores an argument without any bookkeeping, None removes it."""
+        slot = self._arg_slots.get(arg_key)
+        if slot is not None:
+            setattr(self, slot, value)
+        elif value is not None:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[arg_key] = value
+        elif self._extra:
+            self._extra.pop(arg_key, None)
+
+    def _arg_items(self):
+        """Returns the list of (arg key, value) pairs of the arguments which are set."""
+        values = self._arg_getter(self)
+        items = [item for item in zip(self._arg_slots, values) if item[1] is not None]
+        if values[-1]:
+            items.extend(values[-1].items())
+        return items
+
+    @property
+    def parent(self):
+        parent = self._parent
+        if parent.__class__ is ReferenceType:
+            return parent()
+        return parent
+
+    @parent.setter
+    def parent(self, parent):
+        if self._parent is _SHARED:
+            return
+        self._parent = ref(parent) if _WEAK_PARENTS and parent is not None else parent
+
+    @property
+    def shared(self):
+        """
+        Whether this node is an instance shared between trees by an :class:`Interner`.
+        Shared nodes have no parent and can't be mutated, see :meth:`unshare`.
+        """
+        return self._parent is _SHARED
+
+    def _ensure_mutable(self):
+        if self._parent is _SHARED:
+            raise ValueError(
+                f"Cannot mutate the shared {self.__class__.__name__} node, call unshare() first"
+            )
+
+    def unshare(self):
+        """
+        Replaces the shared subtrees of this tree with private copies, so that the
+        tree can be mutated again. These are the interned nodes as well as the subtrees
+        which a persistent :meth:`transform` shares with the tree it was applied to.
+
+        Returns:
+            this expression, or a private copy of it if it is shared itself.
+        """
+        if self.shared:
+            return self.copy()
+
+        # the copies are private all the way down, only the nodes this tree owns are visited
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            for k, v in node._arg_items():
+                if isinstance(v, Expression):
+                    if _is_borrowed(v, node):
+                        v = v.copy()
+                        node._set_arg(k, v)
+                        node._set_parent(k, v)
+                    else:
+                        stack.append(v)
+                elif isinstance(v, list):
+                    borrowed = [_is_borrowed(c, node) for c in v]
+                    if any(borrowed):
+                        new_v = [c.copy() if b else c for c, b in zip(v, borrowed)]
+                        node._set_arg(k, new_v)
+                        node._set_parent(k, new_v)
+                    stack.extend(c for c, b in zip(v, borrowed) if not b and isinstance(c, Expression))
+
+        if self._index is not None:
+            self._index.clear()
+        return self
 
     @property
     def this(self):
-        return self.args.get("this")
+        return self._get_arg("this")
 
     def text(self, key):
-        field = self.args.get(key)
+        field = self._get_arg(key)
         if isinstance(field, str):
             return field
         if isinstance(field, (Identifier, Literal)):
@@ -53,9 +354,38 @@ class Expression:
         return ""
 
     def copy(self):
-        from copy import deepcopy
+        """
+        Returns a deep copy of this tree.
 
-        return deepcopy(self)
+        Only the nodes below this one are copied and the parent links are rebuilt
+        along the way, so the returned root is detached from any parent. Values
+        which are not expressions are assumed to be immutable and are shared.
+        """
+        root = _clone_node(self)
+        stack = [(self, root)]
+
+        while stack:
+            node, clone = stack.pop()
+
+            for k, v in node._arg_items():
+                if isinstance(v, Expression):
+                    child = _clone_node(v, clone, k)
+                    stack.append((v, child))
+                    clone._set_arg(k, child)
+                elif isinstance(v, list):
+                    children = []
+                    for i, item in enumerate(v):
+                        if isinstance(item, Expression):
+                            child = _clone_node(item, clone, k, i)
+                            stack.append((item, child))
+                            children.append(child)
+                        else:
+                            children.append(_copy_value(item))
+                    clone._set_arg(k, children)
+                elif isinstance(v, tuple):
+                    clone._set_arg(k, _copy_value(v))
+
+        return root
 
     @property
     def depth(self):
@@ -66,50 +396,79 @@ class Expression:
             return self.parent.depth + 1
         return 0
 
-    def find(self, *expression_types):
+    def find(self, *expression_types, bfs=True, prune=None):
         """
         Returns the first node in this tree which matches at least one of
         the specified types.
 
         Args:
             expression_types (type): the expression type to match.
+            bfs (bool): whether to search in BFS or DFS order.
+            prune (function): see :meth:`walk`.
 
         Returns:
             the node which matches the criteria or None if no node matching
             the criteria was found.
         """
-        return next(self.find_all(*expression_types), None)
+        return next(self.find_all(*expression_types, bfs=bfs, prune=prune), None)
 
-    def find_all(self, *expression_types):
+    def find_all(self, *expression_types, bfs=True, prune=None):
         """
         Returns a generator object which visits all nodes in this tree and only
         yields those that match at least one of the specified expression types.
 
+        If a type index was enabled on this node with :meth:`enable_index` and no
+        prune function is given, the matches are looked up in the index instead of
+        walking the tree, and yielded in the order in which the walk visits them.
+
         Args:
             expression_types (type): the expression type to match.
+            bfs (bool): whether to search in BFS or DFS order.
+            prune (function): see :meth:`walk`.
 
         Returns:
             the generator object.
         """
-        for expression, _, _ in self.walk():
+        if self._index is not None and prune is None:
+            yield from self._index.find_all(self, expression_types, bfs)
+            return
+
+        for expression in self._walk(bfs, prune, self.parent, None, leaves=False):
             if isinstance(expression, expression_types):
                 yield expression
 
-    def walk(self, bfs=True):
+    def walk(self, bfs=True, prune=None):
         """
         Returns a generator object which visits all nodes in this tree.
 
         Args:
             bfs (bool): if set to True the BFS traversal order will be applied,
                 otherwise the DFS traversal will be used instead.
+            prune (function): a function which takes (node, parent, arg_key) and
+                returns True if the children of node should not be visited.
 
         Returns:
             the generator object.
         """
         if bfs:
-            yield from self.bfs()
+            yield from self.bfs(prune=prune)
         else:
-            yield from self.dfs(self.parent, None)
+            yield from self.dfs(self.parent, None, prune=prune)
+
+    def enable_index(self):
+        """
+        Attaches an index from node class to nodes to this root, so that :meth:`find`
+        and :meth:`find_all` cost O(matches) instead of O(tree). The index is built
+        lazily in a single walk and is rebuilt after :meth:`set`, :meth:`append`,
+        :meth:`replace` and :meth:`transform`. Mutations which bypass these methods
+        are not tracked.
+
+        Returns:
+            this expression.
+        """
+        if self._index is None:
+            self._index = _TypeIndex()
+        return self
 
     def set(self, arg_key: str, value) -> None:
         """
@@ -119,63 +478,176 @@ class Expression:
             arg_key: name of the expression arg.
             value: value to set the arg to.
         """
-        if value is None:
-            self.args.pop(arg_key, None)
-            return
+        self._ensure_mutable()
+        self._set_arg(arg_key, value)
+        if value is not None:
+            self._set_parent(arg_key, value)
+
+        index = self._invalidate()._index
+        if index is not None:
+            index.clear()
+
+    def append(self, arg_key: str, value) -> None:
+        """
+        Appends value to the list stored in arg_key, creating the list if needed.
 
-        self.args[arg_key] = value
-        self._set_parent(arg_key, value)
+        Args:
+            arg_key: name of the list expression arg.
+            value: value to append to the list.
+        """
+        self._ensure_mutable()
+        values = self._get_arg(arg_key)
+        if not isinstance(values, list):
+            values = []
+            self._set_arg(arg_key, values)
+        values.append(value)
+        self._set_parent(arg_key, value, len(values) - 1)
+
+        index = self._invalidate()._index
+        if index is not None:
+            index.clear()
+
+    def _invalidate(self):
+        """Resets the cached state up the parent chain and returns the root."""
+        node = self
+        while True:
+            node._hash = None
+            node._sql = None
+            if node.parent is None:
+                return node
+            node = node.parent
+
+    def replace(self, expression):
+        """
+        Swaps this node for the given expression in its parent.
+
+        The node is located through its parent, arg_key and arg_index, so the cost doesn't
+        depend on the size of the tree: only the cached hashes up the parent chain and the type
+        index of the root, if any, are reset. Lists which were modified without going through
+        the API are searched for the node instead.
 
-    def _set_parent(self, arg_key: str, value) -> None:
-        if hasattr(value, "parent"):
-            value.parent = self
-            value.arg_key = arg_key
+        Args:
+            expression (Expression): the new node, None removes this node from its parent.
+
+        Returns:
+            the new node.
+        """
+        self._ensure_mutable()
+        parent = self.parent
+        if parent is None or expression is self:
+            return expression
+
+        parent._ensure_mutable()
+        arg_key = self.arg_key
+        value = parent._get_arg(arg_key)
+
+        if isinstance(value, list):
+            index = _child_index(value, self)
+            if expression is None:
+                del value[index]
+                for i in range(index, len(value)):
+                    if isinstance(value[i], Expression):
+                        value[i].arg_index = i
+            else:
+                value[index] = expression
+                parent._set_parent(arg_key, expression, index)
+        elif value is self:
+            parent._set_arg(arg_key, expression)
+            if expression is not None:
+                parent._set_parent(arg_key, expression)
+        else:
+            raise ValueError(f"{self.__class__.__name__} node not found in its parent")
+
+        self.parent = None
+        self.arg_key = None
+        self.arg_index = None
+
+        index = parent._invalidate()._index
+        if index is not None:
+            index.clear()
+        return expression
+
+    def pop(self):
+        """
+        Removes this node from its parent, see :meth:`replace`.
+
+        Returns:
+            this node, detached from the tree.
+        """
+        self.replace(None)
+        return self
+
+    def _set_parent(self, arg_key: str, value, index=None) -> None:
+        # shared nodes have no parent, so they don't have a position in one either
+        parent = ref(self) if _WEAK_PARENTS else self
+        if isinstance(value, Expression):
+            if value._parent is not _SHARED:
+                value._parent = parent
+                value.arg_key = arg_key
+                value.arg_index = index
+                value._index = None
         elif isinstance(value, list):
-            for v in value:
-                if hasattr(v, "parent"):
-                    v.parent = self
+            for i, v in enumerate(value):
+                if isinstance(v, Expression) and v._parent is not _SHARED:
+                    v._parent = parent
                     v.arg_key = arg_key
+                    v.arg_index = i
+                    v._index = None
 
-    def dfs(self, parent, key):
+    def dfs(self, parent=None, key=None, prune=None):
         """
         Returns a generator object which visits all nodes in this tree in
-        the DFS (Depth-first) order.
+        the DFS (Depth-first) pre-order.
+
+        Args:
+            parent (Expression): the parent reported for this node.
+            key (str): the arg key reported for this node.
+            prune (function): see :meth:`walk`.
 
         Returns:
-            the generator object.
+            the generator object which yields (node, parent, arg_key) tuples.
         """
-        yield self, parent, key
-
-        for k, v in self.args.items():
-            nodes = ensure_list(v)
-
-            for node in nodes:
-                if isinstance(node, Expression):
-                    yield from node.dfs(self, k)
-                else:
-                    yield node, self, k
+        yield from self._walk(False, prune, parent, key)
 
-    def bfs(self):
+    def bfs(self, prune=None):
         """
         Returns a generator object which visits all nodes in this tree in
         the BFS (Breadth-first) order.
 
+        Args:
+            prune (function): see :meth:`walk`.
+
         Returns:
-            the generator object.
+            the generator object which yields (node, parent, arg_key) tuples.
         """
-        queue = [(self, self.parent, None)]
+        yield from self._walk(True, prune, self.parent, None)
+
+    def _walk(self, bfs, prune, parent, key, leaves=True):
+        # A single deque serves as the BFS queue and as the DFS stack, children are
+        # pushed in reverse order for the DFS so that they are popped in order.
+        # With leaves=False only expression nodes are yielded, without the tuples.
+        queue = deque()
+        queue.append((self, parent, key))
+        pop = queue.popleft if bfs else queue.pop
+        push = queue.append
 
         while queue:
-            item, parent, key = queue.pop()
+            item = pop()
+            node = item[0]
 
-            yield item, parent, key
+            yield item if leaves else node
 
-            if isinstance(item, Expression):
-                for k, v in item.args.items():
-                    nodes = ensure_list(v)
+            if not isinstance(node, Expression) or (prune and prune(*item)):
+                continue
 
-                    for node in nodes:
-                        queue.append((node, item, k))
+            items = node._arg_items()
+            for k, v in items if bfs else reversed(items):
+                if isinstance(v, list):
+                    for child in v if bfs else reversed(v):
+                        if leaves or isinstance(child, Expression):
+                            push((child, node, k))
+                elif v is not None and (leaves or isinstance(v, Expression)):
+                    push((v, node, k))
 
     def __repr__(self):
         return self.to_s()
@@ -196,6 +668,58 @@ class Expression:
 
         return Dialect.get_or_raise(dialect)().generate(self, **opts)
 
+    def dump(self):
+        """
+        Serializes this tree into a compact, versioned binary format.
+
+        Returns
+            the serialized bytes, see :func:`sqlglot.serde.dump`.
+        """
+        from sqlglot.serde import dump
+
+        return dump(self)
+
+    @classmethod
+    def load(cls, data):
+        """
+        Deserializes a tree produced by :meth:`dump`.
+
+        Args
+            data (bytes): the serialized bytes.
+
+        Returns
+            the syntax tree.
+        """
+        from sqlglot.serde import load
+
+        return load(data)
+
+    def dump_json(self):
+        """
+        Serializes this tree into a versioned JSON string.
+
+        Returns
+            the JSON string, see :func:`sqlglot.serde.dump_json`.
+        """
+        from sqlglot.serde import dump_json
+
+        return dump_json(self)
+
+    @classmethod
+    def load_json(cls, data):
+        """
+        Deserializes a tree produced by :meth:`dump_json`.
+
+        Args
+            data (str): the JSON string.
+
+        Returns
+            the syntax tree.
+        """
+        from sqlglot.serde import load_json
+
+        return load_json(data)
+
     def to_s(self, hide_missing=True, level=0):
         indent = "" if not level else "\n"
         indent += "".join(["  "] * level)
@@ -209,7 +733,7 @@ class Expression:
                 for v in ensure_list(vs)
                 if v is not None
             )
-            for k, vs in self.args.items()
+            for k, vs in self._arg_items()
         }
         args = {k: v for k, v in args.items() if v or not hide_missing}
 
@@ -218,7 +742,7 @@ class Expression:
 
         return indent + left + right
 
-    def transform(self, fun, *args, copy=True, **kwargs):
+    def transform(self, fun, *args, copy=True, persistent=False, **kwargs):
         """
         Recursively visits all tree nodes (excluding already transformed ones)
         and applies the given transformation function to each node.
@@ -228,17 +752,39 @@ class Expression:
                 new transformed node or the same node without modifications.
             copy (bool): if set to True a new tree instance is constructed, otherwise the tree is
                 modified in place.
+            persistent (bool): if set to True the tree is neither copied nor modified. Only the
+                nodes on the path from the root to each replaced node are copied, every untouched
+                subtree is shared with the original tree. The shared subtrees keep their parent
+                links into the original tree, so `fun` must not modify the nodes it receives and
+                the result must not be mutated before calling :meth:`unshare` on it.
 
         Returns:
             the transformed tree.
         """
+        if persistent:
+            return self._transform_persistent(fun, args, kwargs)
+
         node = self.copy() if copy else self
-        new_node = fun(node, *args, **kwargs)
+        new_node = node._transform(fun, args, kwargs)
 
-        if not isinstance(new_node, Expression) or new_node is not node:
+        if not copy:
+            root = node._invalidate()
+            if root._index is not None:
+                root._index.clear()
+        return new_node
+
+    def _transform(self, fun, args, kwargs):
+        new_node = fun(self, *args, **kwargs)
+
+        if not isinstance(new_node, Expression) or new_node is not self:
             return new_node
 
-        for k, v in new_node.args.items():
+        if self.shared:
+            # shared subtrees are path copied rather than modified
+            return self._transform_persistent(fun, args, kwargs, visited=True)
+
+        changed = False
+        for k, v in new_node._arg_items():
             is_list_arg = isinstance(v, list)
 
             child_nodes = v if is_list_arg else [v]
@@ -246,23 +792,61 @@ class Expression:
 
             for cn in child_nodes:
                 if isinstance(cn, Expression):
-                    new_child_node = cn.transform(
-                        fun, *args, copy=False, **kwargs)
+                    new_child_node = cn._transform(fun, args, kwargs)
+                    changed = changed or new_child_node is not cn
                     if new_child_node is not None:
                         new_child_node.parent = new_node
+                        new_child_node.arg_key = k
+                        new_child_node.arg_index = len(new_child_nodes) if is_list_arg else None
                 else:
                     new_child_node = cn
                 new_child_nodes.append(new_child_node)
 
             if is_list_arg:
-                new_node.args[k] = new_child_nodes
+                new_node._set_arg(k, new_child_nodes)
             else:
                 if len(new_child_nodes) > 0:
-                    new_node.args[k] = new_child_nodes[0]
+                    new_node._set_arg(k, new_child_nodes[0])
                 # Else do nothing
 
+        if changed:
+            # the cached state is only reset along the paths to the replaced nodes
+            new_node._invalidate()
         return new_node
 
+    def _transform_persistent(self, fun, args, kwargs, visited=False):
+        new_node = self if visited else fun(self, *args, **kwargs)
+
+        if not isinstance(new_node, Expression) or new_node is not self:
+            return new_node
+
+        new_args = None
+
+        for k, v in self._arg_items():
+            if isinstance(v, Expression):
+                new_v = v._transform_persistent(fun, args, kwargs)
+                changed = new_v is not v
+            elif isinstance(v, list):
+                new_v = [
+                    cn._transform_persistent(fun, args, kwargs)
+                    if isinstance(cn, Expression)
+                    else cn
+                    for cn in v
+                ]
+                changed = any(a is not b for a, b in zip(new_v, v))
+            else:
+                continue
+
+            if changed:
+                if new_args is None:
+                    new_args = {}
+                new_args[k] = new_v
+
+        if new_args is None:
+            return self
+
+        return _path_copy(self, new_args)
+
 
 class Annotation(Expression):
     arg_types = {
@@ -549,6 +1133,100 @@ class Select(Expression):
         "using_proxy": False,
     }
 
+    def select(self, *expressions, dialect=None):
+        """
+        Appends projections to this SELECT, in place.
+
+        Args:
+            expressions (str|Expression): the projections. Plain column names such as
+                "a" or "x.a" are turned into columns directly, other strings are parsed.
+            dialect (str): the dialect used to parse strings.
+
+        Returns:
+            this Select expression.
+        """
+        for expression in expressions:
+            for projection in _fragments(expression, Expression, dialect):
+                self.append("expressions", projection)
+        return self
+
+    def from_(self, *expressions, dialect=None):
+        """
+        Appends tables to the FROM clause of this SELECT, in place.
+
+        Args:
+            expressions (str|Expression): the tables. Plain table names such as "x"
+                or "db.x" are turned into tables directly, other strings are parsed.
+            dialect (str): the dialect used to parse strings.
+
+        Returns:
+            this Select expression.
+        """
+        tables = [t for e in expressions for t in _fragments(e, Table, dialect)]
+        from_ = self.args.get("from")
+
+        if from_:
+            for table in tables:
+                from_.append("expressions", table)
+        else:
+            self.set("from", _build(From, expressions=tables))
+        return self
+
+    def join(self, expression, on=None, side=None, kind=None, dialect=None):
+        """
+        Appends joins to this SELECT, in place.
+
+        Args:
+            expression (str|Expression): the table to join or a complete join, either a
+                :class:`Join` or a string of one or more JOIN clauses, e.g. "LEFT JOIN y ON x.a = y.a".
+            on (str|Expression): the join condition.
+            side (str): the join side, e.g. "LEFT".
+            kind (str): the join kind, e.g. "INNER".
+            dialect (str): the dialect used to parse strings.
+
+        Returns:
+            this Select expression.
+        """
+        if isinstance(expression, Join) or (
+            isinstance(expression, str)
+            and expression.split(None, 1)[0].upper() in _JOIN_KEYWORDS
+        ):
+            if on is not None or side or kind:
+                raise ValueError("on, side and kind cannot be combined with a complete join")
+            joins = _fragments(expression, Join, dialect)
+        else:
+            (table,) = _fragments(expression, Table, dialect)
+            joins = [
+                _build(
+                    Join,
+                    this=table,
+                    on=condition(on, dialect=dialect) if on is not None else None,
+                    side=side.upper() if side else None,
+                    kind=kind.upper() if kind else None,
+                )
+            ]
+
+        for join in joins:
+            self.append("joins", join)
+        return self
+
+    def where(self, *expressions, dialect=None):
+        """
+        ANDs conditions to the WHERE clause of this SELECT, in place.
+
+        Args:
+            expressions (str|Expression): the conditions.
+            dialect (str): the dialect used to parse strings.
+
+        Returns:
+            this Select expression.
+        """
+        where = self.args.get("where")
+        conditions = [where.this] if where else []
+        conditions.extend(condition(e, dialect=dialect) for e in expressions)
+        self.set("where", _build(Where, this=and_(*conditions)))
+        return self
+
 
 class TableSample(Expression):
     arg_types = {
@@ -1174,11 +1852,332 @@ class UserFunction(Func):
     is_var_len_args = True
 
 
+class Interner:
+    """
+    Table of shared instances of small subtrees, which the parser uses to represent
+    structurally identical subtrees by the same object when interning is enabled.
+
+    Identifiers, literals, columns, data types and other small subtrees whose children
+    are all shared are looked up by their exact structure (so "a" and "A" are kept
+    apart), a parsed tree thus becomes a DAG. Shared nodes have no parent, refuse to
+    be mutated and are counted once by a type index. Call :meth:`Expression.unshare`
+    or :meth:`Expression.copy` to get a tree which can be mutated.
+
+    The table holds its instances weakly, so they live as long as some tree uses them.
+    """
+
+    TYPES = (Identifier, Literal, Column, DataType, Star, Null, Boolean, Cast)
+
+    __slots__ = ("nodes",)
+
+    def __init__(self):
+        self.nodes = WeakValueDictionary()
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def intern(self, value):
+        """
+        Replaces the subtrees of value which can be shared by their shared instances.
+
+        Args:
+            value (Expression|list): the syntax tree(s).
+
+        Returns:
+            the syntax tree(s), the root is replaced as well if it can be shared.
+        """
+        if isinstance(value, list):
+            return [self.intern(v) for v in value]
+        if isinstance(value, Expression):
+            return self._intern(value)
+        return value
+
+    def _intern(self, node):
+        if node.shared:
+            return node
+
+        # children are referenced by id in the key, which is stable since the
+        # shared parent keeps them alive for as long as its entry exists
+        shareable = isinstance(node, self.TYPES)
+        key = [node.__class__]
+
+        for k, v in node._arg_items():
+            if isinstance(v, Expression):
+                v = self._intern(v)
+                node._set_arg(k, v)
+                shareable = shareable and v.shared
+                if shareable:
+                    key.append((k, id(v)))
+            elif isinstance(v, list):
+                v[:] = [self._intern(c) if isinstance(c, Expression) else c for c in v]
+                shareable = shareable and all(
+                    c.shared for c in v if isinstance(c, Expression)
+                )
+                if shareable:
+                    key.append((k, tuple(id(c) if isinstance(c, Expression) else c for c in v)))
+            elif shareable:
+                key.append((k, v))
+
+        if not shareable:
+            return node
+
+        key = tuple(key)
+        try:
+            shared = self.nodes.get(key)
+        except TypeError:
+            # an unhashable argument value
+            return node
+
+        if shared is None:
+            node._parent = _SHARED
+            node.arg_key = None
+            node.arg_index = None
+            self.nodes[key] = node
+            return node
+        return shared
+
+
+DEFAULT_INTERNER = Interner()
+
+
+class _TypeIndex:
+    """
+    The nodes of a tree grouped by class, in the order of its BFS or DFS walk. Each walk
+    is made once, on the first lookup in its order after the tree was modified.
+    """
+
+    __slots__ = ("walks",)
+
+    def __init__(self):
+        self.walks = {}
+
+    def clear(self):
+        self.walks = {}
+
+    def find_all(self, root, expression_types, bfs=True):
+        classes = self.walks.get(bfs)
+        if classes is None:
+            # a shared node is listed once per place it occurs at, as the walk yields it
+            classes = self.walks[bfs] = {}
+            walk = root._walk(bfs, None, root.parent, None, leaves=False)
+            for position, node in enumerate(walk):
+                entry = classes.get(node.__class__)
+                if entry is None:
+                    entry = classes[node.__class__] = ([], [])
+                entry[0].append(position)
+                entry[1].append(node)
+
+        matches = [entry for cls, entry in classes.items() if issubclass(cls, expression_types)]
+        if len(matches) < 2:
+            return matches[0][1] if matches else []
+        # the nodes of the classes are merged back into the order of the walk
+        return [node for _, node in heapq.merge(*(zip(*entry) for entry in matches))]
+
+
+def select(*expressions, dialect=None):
+    """
+    Starts building a SELECT statement without going through the parser.
+
+    Example:
+        >>> select("a", "SUM(b) AS c").from_("x").join("y", on="x.a = y.a").where("x.b > 1").sql()
+        'SELECT a, SUM(b) AS c FROM x JOIN y ON x.a = y.a WHERE x.b > 1'
+
+    Args:
+        expressions (str|Expression): the projections, see :meth:`Select.select`.
+        dialect (str): the dialect used to parse strings.
+
+    Returns:
+        the :class:`Select` expression.
+    """
+    return Select().select(*expressions, dialect=dialect)
+
+
+def condition(expression, dialect=None):
+    """
+    Returns the given condition as an expression, parsing it if it's a string.
+
+    Args:
+        expression (str|Expression): the condition.
+        dialect (str): the dialect used to parse strings.
+    """
+    (result,) = _fragments(expression, Where, dialect)
+    return result
+
+
+def and_(*expressions, dialect=None):
+    """
+    Combines conditions with AND, parenthesizing the ones that would bind looser.
+
+    Args:
+        expressions (str|Expression): the conditions.
+        dialect (str): the dialect used to parse strings.
+    """
+    return _connect(And, expressions, dialect)
+
+
+def or_(*expressions, dialect=None):
+    """
+    Combines conditions with OR.
+
+    Args:
+        expressions (str|Expression): the conditions.
+        dialect (str): the dialect used to parse strings.
+    """
+    return _connect(Or, expressions, dialect)
+
+
+def _connect(connector, expressions, dialect):
+    result = None
+    for expression in expressions:
+        expression = condition(expression, dialect=dialect)
+        if connector is And and isinstance(expression, Or):
+            expression = _build(Paren, this=expression)
+        result = expression if result is None else _build(connector, this=result, expression=expression)
+
+    if result is None:
+        raise ValueError(f"{connector.__name__} requires at least one condition")
+    return result
+
+
+def _build(exp_class, **args):
+    """Instantiates exp_class after validating args against its arg_types."""
+    for k in args:
+        if k not in exp_class.arg_types:
+            raise ValueError(f"Unexpected keyword: '{k}' for {exp_class}")
+    for k, mandatory in exp_class.arg_types.items():
+        v = args.get(k)
+        if mandatory and (v is None or v == []):
+            raise ValueError(f"Required keyword: '{k}' missing for {exp_class}")
+
+    expression = exp_class(**args)
+    for k, v in args.items():
+        expression._set_parent(k, v)
+    return expression
+
+
+def _fragments(value, expression_type, dialect):
+    if isinstance(value, Expression):
+        return [value]
+    if not isinstance(value, str):
+        raise ValueError(f"Expected a string or an Expression, got {type(value).__name__}")
+
+    names = _plain_names(value)
+    if names and expression_type is Expression:
+        this = Star() if names[-1] == "*" else _identifier(names[-1])
+        table = _identifier(names[-2]) if len(names) > 1 else None
+        db = _identifier(names[-3]) if len(names) > 2 else None
+        return [_build(Column, this=this, table=table, db=db)]
+    if names and expression_type is Table and len(names) <= 2 and "*" not in names:
+        db = _identifier(names[0]) if len(names) == 2 else None
+        return [_build(Table, this=_identifier(names[-1]), db=db)]
+
+    from sqlglot.dialects import Dialect
+
+    return Dialect.get_or_raise(dialect)().parse_into(expression_type, value)
+
+
+def _plain_names(value):
+    """Splits a dotted name made of plain identifiers, returns None for anything else."""
+    names = value.split(".")
+    if len(names) > 3:
+        return None
+    for i, name in enumerate(names):
+        if name == "*" and i == len(names) - 1:
+            continue
+        if not _NAME_RE.fullmatch(name) or name.upper() in Tokenizer.KEYWORDS:
+            return None
+    return names
+
+
+def _identifier(name):
+    return Identifier(this=name, quoted=False)
+
+
+def _child_index(values, child):
+    index = child.arg_index
+    if index is not None and index < len(values) and values[index] is child:
+        return index
+    for i, value in enumerate(values):
+        if value is child:
+            return i
+    raise ValueError(f"{child.__class__.__name__} node not found in its parent")
+
+
+def _iter_expressions(value):
+    for v in ensure_list(value):
+        if isinstance(v, Expression):
+            yield from v._walk(True, None, v.parent, v.arg_key, leaves=False)
+
+
+def _clone_node(node, parent=None, arg_key=None, arg_index=None):
+    """Returns a shallow copy of node, its arguments are shared with node."""
+    clone = node.__class__.__new__(node.__class__)
+    clone._parent = None
+    clone.parent = parent
+    clone.arg_key = arg_key
+    clone.arg_index = arg_index
+    clone._hash = node._hash
+    clone._sql = node._sql
+    clone._sql_key = node._sql_key
+    clone._index = None
+    clone._extra = dict(node._extra) if node._extra else None
+    for slot in node._arg_slots.values():
+        setattr(clone, slot, getattr(node, slot))
+    return clone
+
+
+def _is_borrowed(value, holder):
+    """Whether value is an expression which holder doesn't own, see :meth:`Expression.unshare`."""
+    if not isinstance(value, Expression):
+        return False
+    parent = value.parent
+    return value.shared or (parent is not None and parent is not holder)
+
+
+def _path_copy(node, new_args):
+    """Returns a shallow copy of node with the changed arguments, the other ones are shared."""
+    new_node = _clone_node(node)
+    new_node._hash = None
+    new_node._sql = None
+
+    # the unchanged lists get their own container, so that adding to a list of the
+    # copy doesn't add to the original, the nodes in them are still shared
+    for k, v in new_node._arg_items():
+        if isinstance(v, list) and k not in new_args:
+            new_node._set_arg(k, list(v))
+
+    for k, v in new_args.items():
+        new_node._set_arg(k, v)
+        is_list_arg = isinstance(v, list)
+        for i, cn in enumerate(v if is_list_arg else [v]):
+            # path copies and freshly built replacements are adopted, nodes which
+            # already belong to a tree are shared and keep their parent links
+            if isinstance(cn, Expression) and cn.parent is None:
+                cn.parent = new_node
+                cn.arg_key = k
+                cn.arg_index = i if is_list_arg else None
+
+    return new_node
+
+
+def _copy_value(value):
+    if isinstance(value, Expression):
+        return value.copy()
+    if isinstance(value, list):
+        return [_copy_value(v) for v in value]
+    if isinstance(value, tuple):
+        return tuple(_copy_value(v) for v in value)
+    return value
+
+
 def _norm_args(expression):
+    # an empty list is the same as an absent argument, the parser sets some which the
+    # builders leave out
     return {
         k: _norm_arg(arg) if not isinstance(
             arg, list) else [_norm_arg(a) for a in arg]
-        for k, arg in expression.args.items()
+        for k, arg in expression._arg_items()
+        if arg or not isinstance(arg, list)
     }
 
 
@@ -1188,9 +2187,18 @@ def _norm_arg(arg):
 
 
 def _all_functions():
-    def predicate(obj):
-        return inspect.isclass(obj) and issubclass(obj, Func) and obj not in (AggFunc, Anonymous, Func)
-    return [obj for _, obj in inspect.getmembers(sys.modules[__name__], predicate)]
+    # read from the class registry rather than inspecting the module, importing
+    # inspect alone costs more than the rest of this module
+    return sorted(
+        (
+            cls
+            for cls in _Expression.ids
+            if issubclass(cls, Func)
+            and cls.__module__ == __name__
+            and cls not in (AggFunc, Anonymous, Func)
+        ),
+        key=lambda cls: cls.__name__,
+    )
 
 
 ALL_FUNCTIONS = _all_functions()
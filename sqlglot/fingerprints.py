@@ -0,0 +1,138 @@
+from collections import namedtuple
+from hashlib import blake2b
+
+import sqlglot.expressions as exp
+from sqlglot.dialects import Dialect
+from sqlglot.errors import ParseError, TokenError
+from sqlglot.parser import Parser
+from sqlglot.tokens import TokenType
+
+Fingerprint = namedtuple("Fingerprint", ["hash", "sql"])
+
+PLACEHOLDER = "?"
+
+LITERAL_TOKENS = {
+    TokenType.STRING,
+    TokenType.NUMBER,
+    TokenType.TRUE,
+    TokenType.FALSE,
+    TokenType.NULL,
+}
+
+# tokens which end an operand, a dash following one of them is a binary minus
+_OPERAND_END_TOKENS = LITERAL_TOKENS | {
+    TokenType.VAR,
+    TokenType.IDENTIFIER,
+    TokenType.R_PAREN,
+    TokenType.R_BRACKET,
+}
+
+# tokens which are directly followed by their parenthesized arguments
+_CALL_TOKENS = Parser.FUNC_TOKENS | Parser.TYPE_TOKENS | {TokenType.VAR, TokenType.IDENTIFIER}
+
+_NO_SPACE_BEFORE = {")", ",", ".", "[", "]"}
+_NO_SPACE_AFTER = {"(", ".", "["}
+
+
+def fingerprint(sql, read=None, bits=64):
+    """
+    Computes the fingerprint of a query, which identifies its shape regardless of the
+    values of its literals.
+
+    Literals (strings, numbers, booleans and NULL) are replaced by a placeholder and lists of
+    literals in an IN predicate are collapsed into a single placeholder. Unquoted identifiers are
+    lower cased, keywords are upper cased and whitespace and comments are dropped. Both SQL strings
+    and syntax trees are fingerprinted through the SQL the dialect generates for them, so a query
+    gives the same fingerprint either way, even when it's spelled differently, eg. with or without
+    AS before an alias. Strings which can't be parsed are fingerprinted as they are written.
+
+    Example:
+        >>> fingerprint("select * from X where y in (1, 2, 3) and z = 'a'").sql
+        'SELECT * FROM x WHERE y IN (?) AND z = ?'
+
+    Args
+        sql (str|Expression): the SQL string or syntax tree.
+        read (str): the dialect of the SQL string, or the dialect in which the syntax tree is
+            generated.
+        bits (int): the size of the hash, 64 or 128.
+
+    Returns
+        a (hash, normalized SQL) named tuple.
+    """
+    if bits not in (64, 128):
+        raise ValueError(f"Unsupported fingerprint size {bits}, expected 64 or 128")
+
+    dialect = Dialect.get_or_raise(read)()
+    if isinstance(sql, exp.Expression):
+        sql = dialect.generate(sql)
+    else:
+        try:
+            sql = "; ".join(dialect.generate(e) for e in dialect.parse(sql) if e)
+        except (ParseError, TokenError):
+            pass
+
+    normalized = normalize(dialect.tokenizer().tokenize(sql))
+    digest = blake2b(normalized.encode("utf-8"), digest_size=bits // 8).digest()
+    return Fingerprint(int.from_bytes(digest, "big"), normalized)
+
+
+def normalize(tokens):
+    """
+    Returns the normalized SQL text of a list of tokens, see :func:`fingerprint`.
+    """
+    texts = []
+    types = []
+
+    for token in tokens:
+        token_type = token.token_type
+
+        if token_type in LITERAL_TOKENS:
+            # a dash which doesn't follow an operand is the sign of the number
+            if (
+                token_type == TokenType.NUMBER
+                and types
+                and types[-1] == TokenType.DASH
+                and (len(types) < 2 or types[-2] not in _OPERAND_END_TOKENS)
+            ):
+                texts.pop()
+                types.pop()
+            text = PLACEHOLDER
+        elif token_type == TokenType.VAR:
+            text = token.text.lower()
+        elif token_type == TokenType.IDENTIFIER:
+            text = f'"{token.text}"'
+        elif token_type == TokenType.ANNOTATION:
+            text = f"#{token.text}"
+        else:
+            text = token.text.upper()
+
+        if token_type == TokenType.R_PAREN:
+            _collapse_in_list(texts, types)
+
+        texts.append(text)
+        types.append(token_type)
+
+    sql = []
+    for i, text in enumerate(texts):
+        if i and not (
+            text in _NO_SPACE_BEFORE
+            or texts[i - 1] in _NO_SPACE_AFTER
+            or (text == "(" and types[i - 1] in _CALL_TOKENS)
+        ):
+            sql.append(" ")
+        sql.append(text)
+    return "".join(sql)
+
+
+def _collapse_in_list(texts, types):
+    """Reduces a trailing `IN (?, ?, ...` to `IN (?`."""
+    i = len(texts) - 1
+    while i > 0 and texts[i] == PLACEHOLDER:
+        if texts[i - 1] == "(":
+            if i > 1 and types[i - 2] == TokenType.IN:
+                del texts[i + 1 :]
+                del types[i + 1 :]
+            return
+        if texts[i - 1] != ",":
+            return
+        i -= 2
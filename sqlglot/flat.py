@@ -0,0 +1,324 @@
+# pylint: disable=protected-access
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+import sqlglot.expressions as exp
+from sqlglot.expressions import _copy_value
+
+
+# tags of the non expression argument values
+STRING = 0
+BOOLEAN = 1
+NONE = 2
+DATA_TYPE = 3
+EMPTY_LIST = 4
+OBJECT = 5
+
+
+class StringTable:
+    """
+    Deduplicated table of strings which can be shared by many :class:`FlatTree` instances.
+    """
+
+    __slots__ = ("ids", "strings")
+
+    def __init__(self):
+        self.ids = {}
+        self.strings = []
+
+    def __len__(self):
+        return len(self.strings)
+
+    def __getitem__(self, string_id):
+        return self.strings[string_id]
+
+    def add(self, string):
+        string_id = self.ids.get(string)
+        if string_id is None:
+            string_id = len(self.strings)
+            self.ids[string] = string_id
+            self.strings.append(string)
+        return string_id
+
+
+class FlatTree:
+    """
+    Struct-of-arrays representation of a syntax tree, meant for bulk analytics over
+    large numbers of parsed queries.
+
+    Nodes are stored in DFS pre-order, so every subtree occupies the contiguous range
+    [i, ends[i]). Arguments which are not expressions (identifier names, literals, flags)
+    are stored as (arg key, tag, value) triples, strings go to a :class:`StringTable`.
+    Requires NumPy.
+
+    Attributes
+        kinds (ndarray): the registry id (:attr:`Expression.class_id`) of each node's class.
+        parents (ndarray): the index of each node's parent, -1 for the root.
+        arg_keys (ndarray): the string id of the arg key under which a node is stored in its parent.
+        in_list (ndarray): whether a node is an item of a list argument of its parent.
+        ends (ndarray): the index following the last node of each node's subtree.
+        child_offsets (ndarray): the children of node i are children[child_offsets[i]:child_offsets[i + 1]].
+        children (ndarray): the indices of child nodes, grouped by parent.
+        attr_offsets (ndarray): the attributes of node i are the range attr_offsets[i]:attr_offsets[i + 1].
+        attr_keys (ndarray): the string id of each attribute's arg key.
+        attr_tags (ndarray): the type tag of each attribute's value.
+        attr_values (ndarray): the encoded value of each attribute, depending on its tag.
+        objects (list): values which have no compact encoding, referenced by OBJECT attributes.
+        strings (StringTable): the string table, possibly shared with other trees.
+    """
+
+    __slots__ = (
+        "kinds",
+        "parents",
+        "arg_keys",
+        "in_list",
+        "ends",
+        "child_offsets",
+        "children",
+        "attr_offsets",
+        "attr_keys",
+        "attr_tags",
+        "attr_values",
+        "objects",
+        "strings",
+    )
+
+    def __len__(self):
+        return len(self.kinds)
+
+    @classmethod
+    def from_expression(cls, expression, strings=None):  # pylint: disable=too-many-locals
+        """
+        Converts a syntax tree into a flat tree.
+
+        Args
+            expression (Expression): the syntax tree.
+            strings (StringTable): the string table to use, pass the same table to
+                share it among the trees of a corpus.
+
+        Returns
+            the :class:`FlatTree` instance.
+        """
+        _ensure_numpy()
+        strings = strings if strings is not None else StringTable()
+        add = strings.add
+
+        kinds = []
+        parents = []
+        depths = []
+        arg_keys = []
+        in_list = []
+        attr_counts = []
+        attr_keys = []
+        attr_tags = []
+        attr_values = []
+        objects = []
+
+        stack = [(expression, -1, None, False, 0)]
+
+        while stack:
+            node, parent, key, listed, depth = stack.pop()
+            index = len(kinds)
+            kinds.append(node.class_id)
+            parents.append(parent)
+            depths.append(depth)
+            arg_keys.append(add(key) if key is not None else -1)
+            in_list.append(listed)
+            attrs = 0
+            nested = []
+
+            for k, v in node._arg_items():
+                if isinstance(v, exp.Expression):
+                    nested.append((v, index, k, False, depth + 1))
+                    continue
+
+                if isinstance(v, list) and v and all(isinstance(e, exp.Expression) for e in v):
+                    nested.extend((e, index, k, True, depth + 1) for e in v)
+                    continue
+
+                tag, value = _encode(v, strings, objects)
+                attr_keys.append(add(k))
+                attr_tags.append(tag)
+                attr_values.append(value)
+                attrs += 1
+
+            attr_counts.append(attrs)
+            stack.extend(reversed(nested))
+
+        tree = cls()
+        tree.kinds = np.array(kinds, dtype=np.int16)
+        tree.parents = np.array(parents, dtype=np.int32)
+        tree.arg_keys = np.array(arg_keys, dtype=np.int32)
+        tree.in_list = np.array(in_list, dtype=np.bool_)
+        tree.attr_offsets = _offsets(np.array(attr_counts, dtype=np.int32))
+        tree.attr_keys = np.array(attr_keys, dtype=np.int32)
+        tree.attr_tags = np.array(attr_tags, dtype=np.int8)
+        tree.attr_values = np.array(attr_values, dtype=np.int32)
+        tree.objects = objects
+        tree.strings = strings
+        tree._link(np.array(depths, dtype=np.int32))
+        return tree
+
+    def _link(self, depths):
+        size = len(self.kinds)
+        child_parents = self.parents[1:]
+
+        # pre-order guarantees that children come after their parent and that a
+        # stable sort by parent keeps siblings in order
+        self.children = np.argsort(child_parents, kind="stable").astype(np.int32) + 1
+        self.child_offsets = _offsets(np.bincount(child_parents, minlength=size).astype(np.int32))
+
+        # the subtree sizes are added to the parents one level at a time, from the deepest one
+        sizes = np.ones(size, dtype=np.int32)
+        levels = np.argsort(depths, kind="stable")
+        bounds = _offsets(np.bincount(depths))
+        for depth in range(len(bounds) - 2, 0, -1):
+            nodes = levels[bounds[depth] : bounds[depth + 1]]
+            np.add.at(sizes, self.parents[nodes], sizes[nodes])
+        self.ends = np.arange(size, dtype=np.int32) + sizes
+
+    def to_expression(self):
+        """
+        Converts this flat tree back into a syntax tree.
+
+        Returns
+            the root :class:`~sqlglot.expressions.Expression`.
+        """
+        classes = exp._Expression.ids
+        strings = self.strings
+        nodes = []
+
+        for i, kind in enumerate(self.kinds.tolist()):
+            node = classes[kind]()
+
+            for a in range(self.attr_offsets[i], self.attr_offsets[i + 1]):
+                tag = self.attr_tags[a]
+                value = int(self.attr_values[a])
+
+                if tag == STRING:
+                    value = strings[value]
+                elif tag == BOOLEAN:
+                    value = bool(value)
+                elif tag == NONE:
+                    value = None
+                elif tag == DATA_TYPE:
+                    value = exp.DataType.Type(strings[value])
+                elif tag == EMPTY_LIST:
+                    value = []
+                else:
+                    value = _copy_value(self.objects[value])
+
+                node._set_arg(strings[self.attr_keys[a]], value)
+
+            if i:
+                parent = nodes[self.parents[i]]
+                key = strings[self.arg_keys[i]]
+                if self.in_list[i]:
+                    children = parent._get_arg(key)
+                    if children is None:
+                        children = []
+                        parent._set_arg(key, children)
+                    node.arg_index = len(children)
+                    children.append(node)
+                else:
+                    parent._set_arg(key, node)
+                node.parent = parent
+                node.arg_key = key
+
+            nodes.append(node)
+
+        return nodes[0]
+
+    def kind_ids(self, *expression_types):
+        """
+        Returns the registry ids of all classes which are subclasses of the given types.
+        """
+        return np.array(
+            [c.class_id for c in exp._Expression.ids if issubclass(c, expression_types)],
+            dtype=np.int16,
+        )
+
+    def mask(self, *expression_types):
+        """
+        Returns a boolean mask of the nodes which are instances of the given types.
+        """
+        return np.isin(self.kinds, self.kind_ids(*expression_types))
+
+    def under(self, *expression_types):
+        """
+        Returns a boolean mask of the nodes which are strict descendants of a node of the
+        given types.
+        """
+        ancestors = np.flatnonzero(self.mask(*expression_types))
+        depth = np.zeros(len(self.kinds) + 1, dtype=np.int32)
+        np.add.at(depth, ancestors + 1, 1)
+        np.add.at(depth, self.ends[ancestors], -1)
+        return np.cumsum(depth[:-1]) > 0
+
+    def find_all(self, expression_type, under=None):
+        """
+        Returns the indices of the nodes of the given type, optionally restricted to the
+        ones which are under a node of the `under` type (eg. all columns under a WHERE).
+
+        Args
+            expression_type (type|tuple): the expression type(s) to match.
+            under (type|tuple): the ancestor expression type(s) to restrict the matches to.
+
+        Returns
+            the array of node indices.
+        """
+        mask = self.mask(*_ensure_tuple(expression_type))
+        if under is not None:
+            mask &= self.under(*_ensure_tuple(under))
+        return np.flatnonzero(mask)
+
+    def counts(self):
+        """
+        Returns a dictionary from expression class to the number of nodes of that class.
+        """
+        classes = exp._Expression.ids
+        counts = np.bincount(self.kinds)
+        return {classes[kind]: int(counts[kind]) for kind in np.flatnonzero(counts)}
+
+    def text(self, index, key="this"):
+        """
+        Returns the string value stored in arg `key` of node `index`, or "" if there is none.
+        """
+        key_id = self.strings.ids.get(key)
+        for a in range(self.attr_offsets[index], self.attr_offsets[index + 1]):
+            if self.attr_keys[a] == key_id and self.attr_tags[a] == STRING:
+                return self.strings[self.attr_values[a]]
+        return ""
+
+
+def _encode(value, strings, objects):
+    """Returns the (tag, encoded value) pair of an argument value which isn't an expression."""
+    if isinstance(value, str):
+        return STRING, strings.add(value)
+    if isinstance(value, bool):
+        return BOOLEAN, int(value)
+    if value is None:
+        return NONE, 0
+    if isinstance(value, exp.DataType.Type):
+        return DATA_TYPE, strings.add(value.value)
+    if isinstance(value, list) and not value:
+        return EMPTY_LIST, 0
+    objects.append(value)
+    return OBJECT, len(objects) - 1
+
+
+def _offsets(counts):
+    offsets = np.zeros(len(counts) + 1, dtype=np.int32)
+    np.cumsum(counts, out=offsets[1:])
+    return offsets
+
+
+def _ensure_tuple(value):
+    return value if isinstance(value, tuple) else (value,)
+
+
+def _ensure_numpy():
+    if np is None:
+        raise ImportError("FlatTree requires NumPy, install it with `pip install numpy`")
@@ -1,4 +1,7 @@
+# pylint: disable=protected-access
 import logging
+import re
+from functools import lru_cache
 
 import sqlglot.expressions as exp
 from sqlglot.errors import ErrorLevel, UnsupportedError
@@ -9,6 +12,12 @@ from sqlglot.tokens import Tokenizer
 
 logger = logging.getLogger("sqlglot")
 
+# the approximate size of the chunks of rows yielded by Generator.generate_iter
+CHUNK_SIZE = 1 << 16
+
+# stands for a block of pretty SQL whose text is spliced into the output at the end
+_BLOCK = re.compile("\x00([0-9]+)\x00")
+
 
 class Generator:
     """
@@ -35,6 +44,13 @@ class Generator:
         indent (int): determines the size of indentation in a formatted string. Default: 4.
         unsupported_level (ErrorLevel): determines the generator's behavior when it encounters
             unsupported expressions. Default ErrorLevel.WARN.
+        memoize (bool): if set to True the SQL of every node is cached on the node, so that
+            generating a tree again only generates the nodes which were modified since, and
+            their ancestors. The cache is shared by the generators which have the same
+            configuration, a node only keeps the SQL of the last one. It is reset by the
+            mutations which go through the API (eg. set, append, replace, transform). The SQL
+            of a node must only depend on its subtree, which can't be assumed of the nodes
+            generated by transforms, so these aren't cached. Default: False.
     """
 
     BODY_EXP = (
@@ -72,6 +88,12 @@ class Generator:
         "unsupported_messages",
         "_indent",
         "_level",
+        "_margin",
+        "_blocks",
+        "_handlers",
+        "_memo",
+        "_shared",
+        "_neutral",
     )
 
     def __init__(
@@ -89,9 +111,11 @@ class Generator:
         indent=4,
         index_offset=0,
         unsupported_level=ErrorLevel.WARN,
+        memoize=False,
     ):
         # pylint: disable=too-many-arguments
         self.transforms = {**self.TRANSFORMS, **(transforms or {})}
+        self._handlers = _handlers(self.__class__, self.transforms)
         self.type_mapping = type_mapping or {}
         self.time_mapping = time_mapping or {}
         self.time_trie = time_trie
@@ -107,6 +131,11 @@ class Generator:
         self.unsupported_messages = []
         self._indent = indent
         self._level = 0
+        self._margin = ""
+        self._blocks = None
+        self._memo = _memo_key(self) if memoize else None
+        self._shared = None
+        self._neutral = True
 
     def generate(self, expression):
         """
@@ -119,18 +148,172 @@ class Generator:
             the SQL string.
         """
         self.unsupported_messages = []
-        sql = self.sql(expression).strip()
+        self._level = 0
+        self._margin = ""
+        # memoized SQL is spliced right away, it must not refer to the blocks of another run
+        self._blocks = [] if self.pretty and self._memo is None else None
+        sql = self._spliced(self.sql, expression)
+        self._blocks = None
+        sql = sql.strip()
+
+        self.check_unsupported()
+        return sql
+
+    def generate_iter(self, expression):
+        """
+        Generates the SQL string of the given syntax tree in chunks, which are yielded as soon
+        as they're generated. Their concatenation is the output of :meth:`generate`.
+
+        The set operations (eg. a long chain of UNION ALL), the rows of INSERT ... VALUES and
+        the body of a WITH query are generated one by one, any other expression is generated
+        as a single chunk. Expressions whose generation is customized by a transform or an
+        overridden method are always generated as a single chunk.
+
+        Example:
+            >>> union = sqlglot.parse_one("SELECT 1 UNION ALL SELECT 2")
+            >>> list(Generator().generate_iter(union))
+            ['SELECT 1', ' UNION ALL', ' SELECT 2']
+
+        Args
+            expression (Expression): the syntax tree.
+
+        Returns
+            the iterator of SQL strings. Unsupported expressions are reported once the
+            last chunk has been generated.
+        """
+        self.unsupported_messages = []
+        self._level = 0
+        self._margin = ""
+        # memoized SQL is spliced right away, it must not refer to the blocks of another run
+        self._blocks = [] if self.pretty and self._memo is None else None
+
+        yield from _strip(self._chunks(expression))
+
+        self._blocks = None
+        self.check_unsupported()
+
+    def generate_to(self, expression, writer):
+        """
+        Writes the SQL string of the given syntax tree to `writer` while it's generated,
+        see :meth:`generate_iter`.
+
+        Args
+            expression (Expression): the syntax tree.
+            writer: a text stream, eg. an open file or `socket.makefile("w")`, or any
+                object with a `write` method which takes a string.
+        """
+        write = writer.write
+        for chunk in self.generate_iter(expression):
+            write(chunk)
 
+    def check_unsupported(self):
         if self.unsupported_level == ErrorLevel.IGNORE:
-            return sql
+            return
 
         for msg in self.unsupported_messages:
             if self.unsupported_level == ErrorLevel.RAISE:
                 raise UnsupportedError(msg)
             logger.warning(msg)
 
+    def _chunks(self, expression):
+        stream = self._stream(expression)
+        if stream:
+            yield from stream(self, expression)
+        else:
+            yield self._chunk(self.sql, expression)
+
+    def _stream(self, expression):
+        """Returns the function which generates the expression in chunks, if it can be."""
+        handler, stream = _STREAMS.get(expression.__class__, (None, None))
+        if stream and self._handlers.get(expression.__class__) is handler:
+            return stream
+        return None
+
+    def _chunk(self, generate, *args):
+        """Generates a chunk and splices its pretty blocks, which are no longer needed afterwards."""
+        sql = self._spliced(generate, *args)
+        if self._blocks is not None:
+            self._blocks = []
         return sql
 
+    def _spliced(self, generate, *args):
+        """
+        Returns the output of generate(*args) with the pretty blocks spliced in place of their
+        markers. The markers can't be told apart from NUL characters in the text of the tree,
+        eg. in a string literal, in which case the output is generated again without blocks.
+        """
+        messages = len(self.unsupported_messages)
+        sql = generate(*args)
+        blocks = self._blocks
+        if not blocks:
+            return sql
+
+        if sql.count("\x00") + sum(block.count("\x00") for block in blocks) != 2 * len(blocks):
+            del self.unsupported_messages[messages:]
+            self._blocks = None
+            sql = generate(*args)
+            self._blocks = blocks
+            return sql
+
+        parts = []
+        _splice(sql, blocks, parts)
+        return "".join(parts)
+
+    def _cte_chunks(self, expression):
+        yield self._chunk(self._cte_head, expression)
+        yield from self._chunks(expression._get_arg("this"))
+
+    def _insert_chunks(self, expression):
+        yield self._chunk(self._insert_head, expression)
+        yield from self._chunks(expression._get_arg("expression"))
+
+    def _set_operation_chunks(self, expression):
+        # chains of set operations can be thousands of queries long, so they're walked
+        # iteratively rather than recursively
+        stack = [expression]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, str):
+                yield self._chunk(str, node)
+            elif self._stream(node) is Generator._set_operation_chunks:
+                stack.append(node._get_arg("expression"))
+                stack.append(self._set_operation_sep(_set_operator(node)))
+                stack.append(node._get_arg("this"))
+            else:
+                yield from self._chunks(node)
+
+    def _values_chunks(self, expression):
+        yield f"VALUES{self.seg('')}"
+
+        if self.pretty:
+            indent = self.indent("  ")
+            sep = f"{self.sep(', ')}{indent}"
+        else:
+            indent = ""
+            sep = ", "
+
+        # the rows are small, they're batched to keep the overhead per chunk low, and they're
+        # generated without formatting, so without blocks
+        batch = []
+        size = 0
+        pretty = self.pretty
+        blocks = self._blocks
+        for i, row in enumerate(expression._get_arg("expressions") or []):
+            self.pretty = False
+            self._blocks = None
+            row_sql = self.sql(row)
+            self.pretty = pretty
+            self._blocks = blocks
+            batch.append(sep if i else indent)
+            batch.append(row_sql)
+            size += len(row_sql)
+            if size >= CHUNK_SIZE:
+                yield "".join(batch)
+                batch = []
+                size = 0
+        if batch:
+            yield "".join(batch)
+
     def unsupported(self, message):
         self.unsupported_messages.append(message)
 
@@ -141,13 +324,13 @@ class Generator:
         return sql
 
     def sep(self, sep=" "):
-        return f"{sep.strip()}\n" if self.pretty else sep
+        return f"{sep.strip()}\n{self._margin}" if self.pretty else sep
 
     def seg(self, sql, sep=" ", level=None, pad=0):
         return f"{self.sep(sep)}{self.indent(sql, level=level, pad=pad)}"
 
     def properties(self, name, expression):
-        if expression.args["expressions"]:
+        if expression._get_arg("expressions"):
             return f"{self.seg(name)} ({self.sep('')}{self.expressions(expression)}{self.sep('')})"
         return ""
 
@@ -155,7 +338,14 @@ class Generator:
         self._level += 1
         this_sql = self.indent(self.sql(expression, "this"))
         self._level -= 1
-        return f"({self.sep('')}{this_sql}{self.seg(')', sep='')}"
+        sql = f"({self.sep('')}{this_sql}{self.seg(')', sep='')}"
+
+        if self._blocks is None:
+            return sql
+        # the block is only copied once, into the final output, instead of into the SQL of
+        # every enclosing expression
+        self._blocks.append(sql)
+        return f"\x00{len(self._blocks) - 1}\x00"
 
     def no_format(self, func):
         original = self.pretty
@@ -171,14 +361,21 @@ class Generator:
         self.identify = original
         return result
 
-    def indent_newlines(self, sql, skip_first=False):
+    def indent_block(self, func, skip_first=False):
+        """
+        Calls func with every line break it generates followed by one more level of
+        indentation, so that the lines of a block are laid out as they are written
+        instead of being split and indented again by every enclosing block.
+        """
         if not self.pretty:
-            return sql
+            return func()
 
-        return "\n".join(
-            line if skip_first and i == 0 else self.indent(line, pad=self.pad)
-            for i, line in enumerate(sql.split("\n"))
-        )
+        indent = " " * (self._level * self._indent + self.pad)
+        margin = self._margin
+        self._margin = f"{margin}{indent}"
+        sql = func()
+        self._margin = margin
+        return sql if skip_first else f"{indent}{sql}"
 
     def sql(self, expression, key=None):
         if not expression:
@@ -188,36 +385,87 @@ class Generator:
             return expression
 
         if key:
-            return self.sql(expression.args.get(key))
-
-        transform = self.transforms.get(expression.__class__)
-
-        if callable(transform):
-            return transform(self, expression)
-        if transform:
-            return transform
-
-        exp_handler_name = f"{expression.key}_sql"
-        if hasattr(self, exp_handler_name):
-            return getattr(self, exp_handler_name)(expression)
+            return self.sql(expression._get_arg(key))
+
+        handler = self._handlers.get(expression.__class__)
+        if handler is None:
+            handler = _handler(self.__class__, self.transforms, expression.__class__)
+            self._handlers[expression.__class__] = handler
+
+        if self._memo is not None:
+            if expression.__class__ not in self.transforms:
+                return self._memoized(handler, expression)
+            # transforms are specific to a dialect, see share_memo
+            self._neutral = False
+        return handler(self, expression)
+
+    def _memoized(self, handler, expression):
+        if self._shared is not None:
+            return self._memoized_shared(handler, expression)
+
+        # the layout state matters even where formatting is turned off, a CASE turns it
+        # back on, so it's only left out of the key if formatting is never on
+        if self.configured_pretty or self.identify:
+            key = (self._memo, self.pretty, self.identify, self._level, self._margin)
+        else:
+            key = self._memo
+        sql = expression._sql
+        if sql is not None and (expression._sql_key is key or expression._sql_key == key):
+            return sql
 
-        if isinstance(expression, exp.Func):
-            return self.function_fallback_sql(expression)
+        # the nodes which report unsupported features are generated again, to report them again
+        messages = len(self.unsupported_messages)
+        sql = handler(self, expression)
+        if len(self.unsupported_messages) == messages:
+            expression._sql = sql
+            expression._sql_key = key
+        return sql
 
-        raise ValueError(f"Unsupported expression type {expression.__class__.__name__}")
+    def _memoized_shared(self, handler, expression):
+        shared = self._shared
+        if self.configured_pretty or self.identify:
+            layout = (self.pretty, self.identify, self._level, self._margin)
+            key = (self._memo, *layout)
+            shared_key = (shared.key, *layout)
+        else:
+            key = self._memo
+            shared_key = shared.key
+
+        sql = expression._sql
+        if sql is not None:
+            cached_key = expression._sql_key
+            if cached_key is shared_key or cached_key == shared_key:
+                return sql
+            if cached_key is key or cached_key == key:
+                self._neutral = False
+                return sql
+
+        # a node is neutral if its SQL is the same for all the generators which share the
+        # memoized SQL, which requires the whole subtree to be neutral
+        outer = self._neutral
+        self._neutral = shared.is_neutral(expression)
+        messages = len(self.unsupported_messages)
+        sql = handler(self, expression)
+        neutral = self._neutral
+        self._neutral = outer and neutral
+
+        if len(self.unsupported_messages) == messages:
+            expression._sql = sql
+            expression._sql_key = shared_key if neutral else key
+        return sql
 
     def annotation_sql(self, expression):
         return self.sql(expression, "expression")
 
     def uncache_sql(self, expression):
         table = self.sql(expression, "this")
-        exists_sql = " IF EXISTS" if expression.args.get("exists") else ""
+        exists_sql = " IF EXISTS" if expression._get_arg("exists") else ""
         return f"UNCACHE TABLE{exists_sql} {table}"
 
     def cache_sql(self, expression):
-        lazy = " LAZY" if expression.args.get("lazy") else ""
+        lazy = " LAZY" if expression._get_arg("lazy") else ""
         table = self.sql(expression, "this")
-        options = expression.args.get("options")
+        options = expression._get_arg("options")
         options = (
             f" OPTIONS({self.sql(options[0])} = {self.sql(options[1])})"
             if options
@@ -228,11 +476,11 @@ class Generator:
         return f"CACHE{lazy} TABLE {table}{options}{expression}"
 
     def characterset_sql(self, expression):
-        default = "DEFAULT " if expression.args.get("default") else ""
+        default = "DEFAULT " if expression._get_arg("default") else ""
         return f"{default}CHARACTER SET={self.sql(expression, 'this')}"
 
     def column_sql(self, expression):
-        fields = expression.args.get("fields")
+        fields = expression._get_arg("fields")
 
         if fields:
             return ".".join(self.sql(field) for field in fields)
@@ -250,17 +498,17 @@ class Generator:
     def columndef_sql(self, expression):
         column = self.sql(expression, "this")
         kind = self.sql(expression, "kind")
-        not_null = " NOT NULL" if expression.args.get("not_null") else ""
+        not_null = " NOT NULL" if expression._get_arg("not_null") else ""
         default = self.sql(expression, "default")
         default = f" DEFAULT {default}" if default else ""
         auto_increment = (
-            " AUTO_INCREMENT" if expression.args.get("auto_increment") else ""
+            " AUTO_INCREMENT" if expression._get_arg("auto_increment") else ""
         )
         collate = self.sql(expression, "collate")
         collate = f" COLLATE {collate}" if collate else ""
         comment = self.sql(expression, "comment")
         comment = f" COMMENT {comment}" if comment else ""
-        primary = " PRIMARY KEY" if expression.args.get("primary") else ""
+        primary = " PRIMARY KEY" if expression._get_arg("primary") else ""
         return f"{column} {kind}{not_null}{default}{collate}{auto_increment}{comment}{primary}"
 
     def create_sql(self, expression):
@@ -268,9 +516,9 @@ class Generator:
         kind = self.sql(expression, "kind").upper()
         expression_sql = self.sql(expression, "expression")
         expression_sql = f"AS{self.sep()}{expression_sql}" if expression_sql else ""
-        temporary = " TEMPORARY" if expression.args.get("temporary") else ""
-        replace = " OR REPLACE" if expression.args.get("replace") else ""
-        exists_sql = " IF NOT EXISTS" if expression.args.get("exists") else ""
+        temporary = " TEMPORARY" if expression._get_arg("temporary") else ""
+        replace = " OR REPLACE" if expression._get_arg("replace") else ""
+        exists_sql = " IF NOT EXISTS" if expression._get_arg("exists") else ""
         properties = self.sql(expression, "properties")
         engine = self.sql(expression, "engine")
         engine = f"ENGINE={engine}" if engine else ""
@@ -297,13 +545,16 @@ class Generator:
         return f"CREATE{replace}{temporary} {kind}{exists_sql} {this}{properties} {expression_sql}{options}"
 
     def cte_sql(self, expression):
+        return f"{self._cte_head(expression)}{self.sql(expression, 'this')}"
+
+    def _cte_head(self, expression):
         sql = ", ".join(
             f"{self.sql(e, 'alias')} AS {self.wrap(e)}"
-            for e in expression.args["expressions"]
+            for e in expression._get_arg("expressions")
         )
-        recursive = "RECURSIVE " if expression.args.get("recursive") else ""
+        recursive = "RECURSIVE " if expression._get_arg("recursive") else ""
 
-        return f"WITH {recursive}{sql}{self.sep()}{self.indent(self.sql(expression, 'this'))}"
+        return f"WITH {recursive}{sql}{self.sep()}{self.indent('')}"
 
     def datatype_sql(self, expression):
         type_value = expression.this
@@ -311,7 +562,7 @@ class Generator:
         nested = ""
         interior = self.expressions(expression, flat=True)
         if interior:
-            nested = f"<{interior}>" if expression.args["nested"] else f"({interior})"
+            nested = f"<{interior}>" if expression._get_arg("nested") else f"({interior})"
         return f"{type_sql}{nested}"
 
     def delete_sql(self, expression):
@@ -321,18 +572,15 @@ class Generator:
 
     def drop_sql(self, expression):
         this = self.sql(expression, "this")
-        kind = expression.args["kind"].upper()
-        exists_sql = " IF EXISTS " if expression.args.get("exists") else " "
+        kind = expression._get_arg("kind").upper()
+        exists_sql = " IF EXISTS " if expression._get_arg("exists") else " "
         return f"DROP {kind}{exists_sql}{this}"
 
     def except_sql(self, expression):
-        return self.set_operation(
-            expression,
-            f"EXCEPT{' DISTINCT' if expression.args.get('distinct') else ''}",
-        )
+        return self.set_operation(expression, _set_operator(expression))
 
     def exists_sql(self, expression):
-        exists = "NOT EXISTS" if expression.args.get("not") else "EXISTS"
+        exists = "NOT EXISTS" if expression._get_arg("not") else "EXISTS"
         return f"{exists} {self.wrap(expression)}"
 
     def hint_sql(self, expression):
@@ -341,16 +589,16 @@ class Generator:
         return ""
 
     def identifier_sql(self, expression):
-        value = expression.args.get("this") or ""
-        if expression.args.get("quoted") or self.identify:
+        value = expression._get_arg("this") or ""
+        if expression._get_arg("quoted") or self.identify:
             return f"{self.identifier}{value}{self.identifier}"
         return value
 
     def partition_sql(self, expression):
         keys = csv(
             *[
-                f"{k.args['this']}='{v.args['this']}'" if v else k.args["this"]
-                for k, v in expression.args.get("this")
+                f"{k._get_arg('this')}='{v._get_arg('this')}'" if v else k._get_arg("this")
+                for k, v in expression._get_arg("this")
             ]
         )
         return f"PARTITION({keys}) "
@@ -364,23 +612,22 @@ class Generator:
         return f"{key} = {value}"
 
     def insert_sql(self, expression):
-        kind = "OVERWRITE TABLE" if expression.args.get("overwrite") else "INTO"
+        return f"{self._insert_head(expression)}{self.sql(expression, 'expression')}"
+
+    def _insert_head(self, expression):
+        kind = "OVERWRITE TABLE" if expression._get_arg("overwrite") else "INTO"
         this = self.sql(expression, "this")
-        exists = " IF EXISTS " if expression.args.get("exists") else " "
+        exists = " IF EXISTS " if expression._get_arg("exists") else " "
         partition_sql = (
             self.sql(expression, "partition")
-            if expression.args.get("partition")
+            if expression._get_arg("partition")
             else ""
         )
-        expression_sql = self.sql(expression, "expression")
         sep = self.sep(sep="") if partition_sql else ""
-        return f"INSERT {kind} {this}{exists}{partition_sql}{sep}{expression_sql}"
+        return f"INSERT {kind} {this}{exists}{partition_sql}{sep}"
 
     def intersect_sql(self, expression):
-        return self.set_operation(
-            expression,
-            f"INTERSECT{' DISTINCT' if expression.args.get('distinct') else ''}",
-        )
+        return self.set_operation(expression, _set_operator(expression))
 
     def table_sql(self, expression):
         return ".".join(
@@ -421,24 +668,23 @@ class Generator:
         return f"VALUES{self.seg('')}{self.expressions(expression)}"
 
     def from_sql(self, expression):
-        expressions = ", ".join(self.sql(e) for e in expression.args["expressions"])
+        expressions = ", ".join(self.sql(e) for e in expression._get_arg("expressions"))
         return f"{self.seg('FROM')} {expressions}"
 
     def group_sql(self, expression):
         return self.op_expressions("GROUP BY", expression)
 
     def having_sql(self, expression):
-        this = self.indent_newlines(self.sql(expression, "this"))
+        this = self.indent_block(lambda: self.sql(expression, "this"))
         return f"{self.seg('HAVING')}{self.sep()}{this}"
 
     def join_sql(self, expression):
         side = self.sql(expression, "side").upper()
         kind = self.sql(expression, "kind").upper()
         op_sql = self.seg(" ".join(op for op in [side, kind, "JOIN"] if op))
-        on_sql = self.sql(expression, "on")
+        on_sql = self.indent_block(lambda: self.sql(expression, "on"), skip_first=True)
 
         if on_sql:
-            on_sql = self.indent_newlines(on_sql, skip_first=True)
             on_sql = f"{self.seg('ON', pad=self.pad)} {on_sql}"
 
         expression_sql = self.sql(expression, "expression")
@@ -453,10 +699,10 @@ class Generator:
     def lateral_sql(self, expression):
         this = self.sql(expression, "this")
         op_sql = self.seg(
-            f"LATERAL VIEW{' OUTER' if expression.args.get('outer') else ''}"
+            f"LATERAL VIEW{' OUTER' if expression._get_arg('outer') else ''}"
         )
         alias = self.sql(expression, "table")
-        columns = ", ".join(self.sql(e) for e in expression.args.get("columns") or [])
+        columns = ", ".join(self.sql(e) for e in expression._get_arg("columns") or [])
         columns = f" AS {columns}" if columns else ""
         return f"{op_sql}{self.sep()}{this} {alias}{columns}"
 
@@ -485,21 +731,21 @@ class Generator:
         return self.op_expressions("ORDER BY", expression, flat=flat)
 
     def ordered_sql(self, expression):
-        desc = expression.args.get("desc")
+        desc = expression._get_arg("desc")
         desc = " DESC" if desc else ""
         return f"{self.sql(expression, 'this')}{desc}"
 
     def select_sql(self, expression):
         hint = self.sql(expression, "hint")
-        distinct = " DISTINCT" if expression.args.get("distinct") else ""
+        distinct = " DISTINCT" if expression._get_arg("distinct") else ""
         expressions = self.expressions(expression)
         select = "SELECT" if expressions else ""
         sep = self.sep() if expressions else ""
         return csv(
             f"{select}{hint}{distinct}{sep}{expressions}",
             self.sql(expression, "from"),
-            *[self.sql(sql) for sql in expression.args.get("laterals", [])],
-            *[self.sql(sql) for sql in expression.args.get("joins", [])],
+            *[self.sql(sql) for sql in expression._get_arg("laterals", [])],
+            *[self.sql(sql) for sql in expression._get_arg("joins", [])],
             self.sql(expression, "where"),
             self.sql(expression, "group"),
             self.sql(expression, "having"),
@@ -526,35 +772,33 @@ class Generator:
         return "*"
 
     def union_sql(self, expression):
-        return self.set_operation(
-            expression, f"UNION{'' if expression.args.get('distinct') else ' ALL'}"
-        )
+        return self.set_operation(expression, _set_operator(expression))
 
     def unnest_sql(self, expression):
         args = self.expressions(expression, flat=True)
         table = self.sql(expression, "table")
-        ordinality = " WITH ORDINALITY" if expression.args.get("ordinality") else ""
-        columns = ", ".join(self.sql(e) for e in expression.args.get("columns", []))
+        ordinality = " WITH ORDINALITY" if expression._get_arg("ordinality") else ""
+        columns = ", ".join(self.sql(e) for e in expression._get_arg("columns", []))
         alias = f" AS {table}" if table else ""
         alias = f"{alias} ({columns})" if columns else alias
         return f"UNNEST({args}){ordinality}{alias}"
 
     def where_sql(self, expression):
-        this = self.indent_newlines(self.sql(expression, "this"))
+        this = self.indent_block(lambda: self.sql(expression, "this"))
         return f"{self.seg('WHERE')}{self.sep()}{this}"
 
     def window_sql(self, expression):
         this_sql = self.sql(expression, "this")
-        partition = expression.args.get("partition_by")
+        partition = expression._get_arg("partition_by")
         partition = (
             "PARTITION BY " + ", ".join(self.sql(by) for by in partition)
             if partition
             else ""
         )
-        order = expression.args.get("order")
+        order = expression._get_arg("order")
         order_sql = self.order_sql(order, flat=True) if order else ""
         partition_sql = partition + " " if partition and order else partition
-        spec = expression.args.get("spec")
+        spec = expression._get_arg("spec")
         spec_sql = " " + self.window_spec_sql(spec) if spec else ""
         return f"{this_sql} OVER({partition_sql}{order_sql}{spec_sql})"
 
@@ -576,7 +820,7 @@ class Generator:
 
     def bracket_sql(self, expression):
         expressions = apply_index_offset(
-            expression.args["expressions"], self.index_offset
+            expression._get_arg("expressions"), self.index_offset
         )
         expressions = ", ".join(self.sql(e) for e in expressions)
 
@@ -590,10 +834,10 @@ class Generator:
 
         ifs = [
             f"WHEN {self.sql(e, 'this')} THEN {self.sql(e, 'true')}"
-            for e in expression.args["ifs"]
+            for e in expression._get_arg("ifs")
         ]
 
-        if expression.args.get("default") is not None:
+        if expression._get_arg("default") is not None:
             ifs.append(f"ELSE {self.sql(expression, 'default')}")
 
         original = self.pretty
@@ -605,8 +849,8 @@ class Generator:
 
     def decimal_sql(self, expression):
         args = ", ".join(
-            arg.args.get("this")
-            for arg in [expression.args.get("precision"), expression.args.get("scale")]
+            arg._get_arg("this")
+            for arg in [expression._get_arg("precision"), expression._get_arg("scale")]
             if arg
         )
         return f"DECIMAL({args})"
@@ -618,7 +862,7 @@ class Generator:
 
     def if_sql(self, expression):
         return self.case_sql(
-            exp.Case(ifs=[expression], default=expression.args.get("false"))
+            exp.Case(ifs=[expression], default=expression._get_arg("false"))
         )
 
     def in_sql(self, expression):
@@ -649,7 +893,7 @@ class Generator:
         to_sql = self.sql(expression, "alias")
         to_sql = f" AS {to_sql}" if to_sql else ""
 
-        if isinstance(expression.args["this"], self.BODY_EXP):
+        if isinstance(expression._get_arg("this"), self.BODY_EXP):
             if self.pretty:
                 return f"{self.wrap(expression)}{to_sql}"
             return f"({self.sql(expression, 'this')}){to_sql}"
@@ -689,15 +933,15 @@ class Generator:
         return f"{self.sql(expression, 'this').upper()} {expression.text('expression').strip()}"
 
     def count_sql(self, expression):
-        distinct = "DISTINCT " if expression.args["distinct"] else ""
+        distinct = "DISTINCT " if expression._get_arg("distinct") else ""
         return f"COUNT({distinct}{self.sql(expression, 'this')})"
 
     def intdiv_sql(self, expression):
         return self.sql(
             exp.Cast(
                 this=exp.Div(
-                    this=expression.args["this"],
-                    expression=expression.args["expression"],
+                    this=expression._get_arg("this"),
+                    expression=expression._get_arg("expression"),
                 ),
                 to=exp.DataType(this=exp.DataType.Type.INT),
             )
@@ -776,13 +1020,13 @@ class Generator:
         return f"{self.seg('USING_PROXY')} {self.sql(expression, 'this')}"
 
     def binary(self, expression, op, newline=False):
-        sep = "\n" if newline else " "
+        sep = f"\n{self._margin}" if newline else " "
         return f"{self.sql(expression, 'this')}{sep}{op} {self.sql(expression, 'expression')}"
 
     def function_fallback_sql(self, expression):
         args = []
         for arg_key in expression.arg_types:
-            arg_value = ensure_list(expression.args.get(arg_key) or [])
+            arg_value = ensure_list(expression._get_arg(arg_key) or [])
             for a in arg_value:
                 args.append(self.sql(a))
 
@@ -795,18 +1039,17 @@ class Generator:
         )
 
     def expressions(self, expression, flat=False, pad=0):
-        # pylint: disable=cell-var-from-loop
-        expressions = expression.args.get("expressions") or []
-        if flat:
+        expressions = expression._get_arg("expressions") or []
+        if flat or not self.pretty:
             return ", ".join(self.sql(e) for e in expressions)
 
-        return self.sep(", ").join(
-            self.indent(
-                f"{'  ' if self.pretty else ''}{self.no_format(lambda: self.sql(e))}",
-                pad=pad,
-            )
-            for e in expressions
-        )
+        sqls = self.no_format(lambda: [self.sql(e) for e in expressions])
+        if not sqls:
+            return ""
+        # every item goes on its own line, with the same indentation
+        indent = self.indent("  ", pad=pad)
+        sep = f"{self.sep(', ')}{indent}"
+        return f"{indent}{sep.join(sqls)}"
 
     def op_expressions(self, op, expression, flat=False):
         expressions_sql = self.expressions(expression, flat=flat)
@@ -816,6 +1059,214 @@ class Generator:
 
     def set_operation(self, expression, op):
         this = self.sql(expression, "this")
-        op = self.seg(op)
-        expression = self.indent(self.sql(expression, "expression"), pad=0)
-        return f"{this}{op}{self.sep()}{expression}"
+        expression = self.sql(expression, "expression")
+        return f"{this}{self._set_operation_sep(op)}{expression}"
+
+    def _set_operation_sep(self, op):
+        return f"{self.seg(op)}{self.sep()}{self.indent('', pad=0)}"
+
+
+# the memoization keys of the generator configurations, see _memo_key
+_MEMO_KEYS = {}
+
+
+def _memo_key(generator):
+    """
+    Returns the key under which a generator memoizes the SQL of nodes. Generators with the same
+    configuration get the same key object, so it can be compared by identity.
+    """
+    try:
+        key = (
+            generator.__class__,
+            frozenset(generator.transforms.items()),
+            frozenset(generator.type_mapping.items()),
+            frozenset(generator.time_mapping.items()),
+            generator.configured_pretty,
+            generator.identifier,
+            generator.quote,
+            generator.escape,
+            generator.pad,
+            generator._indent,
+            generator.index_offset,
+        )
+        return _MEMO_KEYS.setdefault(key, key)
+    except TypeError:
+        # not hashable, the key is private to this generator
+        return object()
+
+
+def share_memo(generators):
+    """
+    Lets memoizing generators reuse the SQL generated by one another for the subtrees which
+    they all generate the same way, eg. to generate a tree for several dialects. A subtree
+    qualifies if none of its nodes is generated by a transform, by different methods or
+    from a part of the configuration which differs between the generators, such as the type
+    mapping of a data type or the delimiter of a quoted identifier.
+
+    Args
+        generators (list): the generators, memoization is enabled for all of them.
+
+    Returns
+        the list of generators.
+    """
+    generators = list(generators)
+    shared = _SharedMemo(generators)
+    for generator in generators:
+        if generator._memo is None:
+            generator._memo = _memo_key(generator)
+        generator._shared = shared
+    return generators
+
+
+# the configuration that the SQL of these expressions depends on, besides their handler
+_CONFIG_DEPENDENT = {
+    exp.Identifier: ("identifier", "identify"),
+    exp.Literal: ("quote", "escape"),
+    exp.DataType: ("type_mapping",),
+    exp.Bracket: ("index_offset",),
+}
+
+# the configuration that the layout of the SQL of every expression depends on
+_LAYOUT = ("configured_pretty", "pad", "_indent")
+
+
+class _SharedMemo:
+    """The classes of the nodes whose SQL is the same for a group of generators, see share_memo."""
+
+    __slots__ = ("key", "classes", "checks")
+
+    def __init__(self, generators):
+        first, others = generators[0], generators[1:]
+        differs = {
+            attr
+            for attr in {*_LAYOUT, *(a for attrs in _CONFIG_DEPENDENT.values() for a in attrs)}
+            if any(getattr(g, attr) != getattr(first, attr) for g in others)
+        }
+
+        identify = any(g.identify for g in generators)
+        type_mappings = [g.type_mapping for g in generators]
+        checks = {
+            exp.Identifier: lambda e: not identify and not e._get_arg("quoted"),
+            exp.Literal: lambda e: not e.is_string,
+            exp.DataType: lambda e: len({m.get(e.this) for m in type_mappings}) == 1,
+        }
+
+        # the memoized SQL of a generator is only reused by the others through this key
+        self.key = object()
+        self.classes = set()
+        self.checks = {}
+
+        if differs.intersection(_LAYOUT):
+            return
+
+        for expression_class in exp._Expression.ids:
+            if any(expression_class in g.transforms for g in generators):
+                continue
+            handler = _handler(first.__class__, first.transforms, expression_class)
+            if any(_handler(g.__class__, g.transforms, expression_class) is not handler for g in others):
+                continue
+            if differs.intersection(_CONFIG_DEPENDENT.get(expression_class, ())):
+                if expression_class in checks:
+                    self.checks[expression_class] = checks[expression_class]
+            else:
+                self.classes.add(expression_class)
+
+    def is_neutral(self, expression):
+        if expression.__class__ in self.classes:
+            return True
+        check = self.checks.get(expression.__class__)
+        return check is not None and check(expression)
+
+
+def _set_operator(expression):
+    distinct = expression._get_arg("distinct")
+    if isinstance(expression, exp.Union):
+        return f"UNION{'' if distinct else ' ALL'}"
+    return f"{expression.key.upper()}{' DISTINCT' if distinct else ''}"
+
+
+# the expressions which generate_iter splits into chunks, with the handler they replace
+_STREAMS = {
+    exp.CTE: (Generator.cte_sql, Generator._cte_chunks),
+    exp.Insert: (Generator.insert_sql, Generator._insert_chunks),
+    exp.Union: (Generator.union_sql, Generator._set_operation_chunks),
+    exp.Intersect: (Generator.intersect_sql, Generator._set_operation_chunks),
+    exp.Except: (Generator.except_sql, Generator._set_operation_chunks),
+    exp.Values: (Generator.values_sql, Generator._values_chunks),
+}
+
+
+def _strip(chunks):
+    """Strips the leading and trailing whitespace of the concatenation of the chunks."""
+    started = False
+    pending = ""
+    for chunk in chunks:
+        if not started:
+            chunk = chunk.lstrip()
+            started = bool(chunk)
+        sql = chunk.rstrip()
+        if sql:
+            yield f"{pending}{sql}" if pending else sql
+            pending = chunk[len(sql) :]
+        else:
+            # whitespace is only yielded once it's known not to be trailing
+            pending = f"{pending}{chunk}"
+
+
+def _handlers(generator_class, transforms):
+    """
+    Returns the table from expression class to the function which generates its SQL, for the
+    given generator class and transforms. The tables are shared by the generators which have
+    the same configuration, classes which are defined later are added on first use.
+    """
+    try:
+        key = frozenset(transforms.items())
+    except TypeError:
+        return _build_handlers(generator_class, transforms)
+    return _cached_handlers(generator_class, key)
+
+
+@lru_cache(maxsize=64)
+def _cached_handlers(generator_class, transforms):
+    return _build_handlers(generator_class, dict(transforms))
+
+
+def _build_handlers(generator_class, transforms):
+    return {
+        expression_class: _handler(generator_class, transforms, expression_class)
+        for expression_class in exp._Expression.ids
+    }
+
+
+def _handler(generator_class, transforms, expression_class):
+    transform = transforms.get(expression_class)
+
+    if callable(transform):
+        return transform
+    if transform:
+        return lambda self, expression: transform
+
+    method = getattr(generator_class, f"{expression_class.key}_sql", None)
+    if method is not None:
+        return method
+
+    if issubclass(expression_class, exp.Func):
+        return generator_class.function_fallback_sql
+
+    def unsupported(self, expression):
+        raise ValueError(f"Unsupported expression type {expression.__class__.__name__}")
+
+    return unsupported
+
+
+def _splice(sql, blocks, parts):
+    """Appends the parts of the output to `parts`, replacing the block markers by their text."""
+    if "\x00" not in sql:
+        parts.append(sql)
+        return
+
+    split = _BLOCK.split(sql)
+    parts.append(split[0])
+    for i in range(1, len(split), 2):
+        _splice(blocks[int(split[i])], blocks, parts)
+        parts.append(split[i + 1])
@@ -57,7 +57,7 @@ def apply_index_offset(expressions, offset):
     if isinstance(expression, exp.Literal) and expression.is_int:
         expression = expression.copy()
         logger.warning("Applying array index offset (%s)", offset)
-        expression.args["this"] = str(int(expression.args["this"]) + offset)
+        expression.set("this", str(int(expression.args["this"]) + offset))
         return [expression]
     return expressions
 
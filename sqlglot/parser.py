@@ -1,8 +1,9 @@
+# pylint: disable=protected-access
 import logging
 
 import sqlglot.constants as c
 from sqlglot.errors import ErrorLevel, ParseError
-from sqlglot.helper import apply_index_offset, list_get
+from sqlglot.helper import apply_index_offset, ensure_list, list_get
 from sqlglot.tokens import Token, Tokenizer, TokenType
 import sqlglot.expressions as exp
 
@@ -27,6 +28,9 @@ class Parser:
             Default: 0
         strict_cast (boolean): if true, cast is expected to raise an error on failure
             Default: True
+        intern (bool|Interner): if set, structurally identical small subtrees are represented
+            by shared instances from this :class:`~sqlglot.expressions.Interner`, True uses
+            a process-wide one. Default: None
     """
 
     def _parse_decimal(args):
@@ -177,6 +181,15 @@ class Parser:
         TokenType.EXCEPT,
     }
 
+    FRAGMENT_PARSERS = {
+        exp.Expression: lambda self: self._parse_csv(
+            lambda: self._parse_annotation(self._parse_expression())
+        ),
+        exp.Table: lambda self: self._parse_csv(self._parse_table),
+        exp.Join: lambda self: self._parse_joins(),
+        exp.Where: lambda self: [self._parse_conjunction()],
+    }
+
     __slots__ = (
         "functions",
         "error_level",
@@ -185,6 +198,7 @@ class Parser:
         "errors",
         "index_offset",
         "strict_cast",
+        "interner",
         "_tokens",
         "_chunks",
         "_index",
@@ -200,12 +214,17 @@ class Parser:
         error_message_context=100,
         index_offset=0,
         strict_cast=True,
+        *,
+        intern=None,
     ):
         self.functions = {**self.FUNCTIONS, **(functions or {})}
         self.error_level = error_level or ErrorLevel.RAISE
         self.error_message_context = error_message_context
         self.index_offset = index_offset
         self.strict_cast = strict_cast
+        self.interner = intern if isinstance(intern, exp.Interner) else None
+        if intern is True:
+            self.interner = exp.DEFAULT_INTERNER
         self.reset()
 
     def reset(self):
@@ -230,6 +249,35 @@ class Parser:
         Returns
             the list of syntax trees (:class:`~sqlglot.expressions.Expression`).
         """
+        return self._parse(self.__class__._parse_statement, raw_tokens, code)
+
+    def parse_into(self, expression_type, raw_tokens, code=None):
+        """
+        Parses the given list of tokens as a fragment of a statement rather than a whole
+        statement, e.g. the tables of a FROM or the joins of a SELECT.
+
+        Args
+            expression_type (type): the kind of fragment, one of the keys of `FRAGMENT_PARSERS`:
+                :class:`~sqlglot.expressions.Expression` for projections,
+                :class:`~sqlglot.expressions.Table` for tables,
+                :class:`~sqlglot.expressions.Join` for JOIN clauses and
+                :class:`~sqlglot.expressions.Where` for a condition.
+            raw_tokens (list): the list of tokens (:class:`~sqlglot.tokens.Token`).
+            code (str): the original SQL string. Used to produce helpful debug messages.
+
+        Returns
+            the list of parsed fragments.
+        """
+        parse_method = self.FRAGMENT_PARSERS.get(expression_type)
+        if parse_method is None:
+            raise ValueError(f"Cannot parse a fragment of type {expression_type.__name__}")
+        return [
+            fragment
+            for fragments in self._parse(parse_method, raw_tokens, code)
+            for fragment in fragments
+        ]
+
+    def _parse(self, parse_method, raw_tokens, code):
         self.reset()
         self.code = code or ""
         total = len(raw_tokens)
@@ -246,13 +294,16 @@ class Parser:
             self._index = -1
             self._tokens = tokens
             self._advance()
-            expressions.append(self._parse_statement())
+            expressions.append(parse_method(self))
+
+            if self.interner is not None:
+                expressions[-1] = self.interner.intern(expressions[-1])
 
             if self._index < len(self._tokens):
                 self.raise_error("Invalid expression / Unexpected token")
 
             self.check_errors()
-            self.set_parents(expressions)
+            self.set_parents(ensure_list(expressions[-1]))
 
         return expressions
 
@@ -267,10 +318,17 @@ class Parser:
         for expression in expressions:
             if not expression:
                 continue
-            for node, parent, key in expression.walk():
-                if isinstance(node, exp.Expression) and parent:
-                    node.parent = parent
-                    node.arg_key = key
+            # the arguments of each node are read once, to link them and to visit them
+            stack = [expression]
+            while stack:
+                node = stack.pop()
+                for key, value in node._arg_items():
+                    if isinstance(value, exp.Expression):
+                        node._set_parent(key, value)
+                        stack.append(value)
+                    elif isinstance(value, list):
+                        node._set_parent(key, value)
+                        stack.extend(v for v in value if isinstance(v, exp.Expression))
 
     def raise_error(self, message, token=None):
         token = token or self._curr or self._prev or Token.string("")
@@ -296,14 +354,19 @@ class Parser:
         if self.error_level == ErrorLevel.IGNORE:
             return
 
-        for k in expression.args:
-            if k not in expression.arg_types:
-                self.raise_error(
-                    f"Unexpected keyword: '{k}' for {expression.__class__}"
-                )
+        # only the arguments outside the slots and the slots inherited for arguments which the
+        # class doesn't declare can hold unexpected keywords
+        if expression._extra or len(expression._arg_slots) > len(expression.arg_types):
+            for k, _ in expression._arg_items():
+                if k not in expression.arg_types:
+                    self.raise_error(
+                        f"Unexpected keyword: '{k}' for {expression.__class__}"
+                    )
         for k, mandatory in expression.arg_types.items():
-            v = expression.args.get(k)
-            if mandatory and (v is None or v == []):
+            if not mandatory:
+                continue
+            v = expression._get_arg(k)
+            if v is None or v == []:
                 self.raise_error(
                     f"Required keyword: '{k}' missing for {expression.__class__}"
                 )
@@ -480,9 +543,10 @@ class Parser:
                     for expression in schema.args["expressions"]
                     if expression.this.text("this").upper() in columns
                 ]
-                schema.args["expressions"] = [
-                    e for e in schema.args["expressions"] if e not in partitions
-                ]
+                schema.set(
+                    "expressions",
+                    [e for e in schema.args["expressions"] if e not in partitions],
+                )
                 value = self.expression(exp.Schema, expressions=partitions)
         else:
             value = self._parse_string()
@@ -1,7 +1,4 @@
-from copy import deepcopy
-
 import sqlglot.expressions as exp
-from sqlglot import parse_one
 
 
 class chainable:
@@ -10,7 +7,12 @@ class chainable:
 
     def __set_name__(self, owner, name):
         def wrapper(rewriter, *args, **kwargs):
+            if rewriter.committed:
+                raise ValueError("Batch already committed")
             expression = self.func(rewriter, *args, **kwargs)
+            if rewriter.batched:
+                rewriter.expression = expression
+                return rewriter
             return Rewriter(expression, rewriter.copy)
 
         setattr(owner, name, wrapper)
@@ -19,7 +21,37 @@ class chainable:
 class Rewriter:
     def __init__(self, expression, copy=True):
         self.copy = copy
-        self.expression = deepcopy(expression) if copy else expression
+        self.expression = expression.copy() if copy else expression
+        self.batched = False
+        self.committed = False
+
+    def batch(self):
+        """
+        Returns a rewriter which applies all the chained edits in place on a single copy of
+        the expression, instead of copying it after every edit. The copy is made when the
+        batch is started, so neither this rewriter nor the expression it was given is
+        modified. The result is returned by :meth:`commit`, after which the batch can't be
+        edited anymore.
+
+        Example:
+            >>> rewriter = Rewriter(sqlglot.parse_one("SELECT a FROM x"))
+            >>> rewriter.batch().add_selects("b").add_where("AND", "c > 1").commit().sql()
+            'SELECT a, b FROM x WHERE c > 1'
+        """
+        rewriter = Rewriter(self.expression, copy=True)
+        rewriter.batched = True
+        return rewriter
+
+    def commit(self):
+        """
+        Ends a batch started by :meth:`batch` and returns the rewritten expression.
+        """
+        if not self.batched:
+            raise ValueError("Not a batch")
+        if self.committed:
+            raise ValueError("Batch already committed")
+        self.committed = True
+        return self.expression
 
     @chainable
     def ctas(self, table, db=None, **properties):
@@ -43,33 +75,23 @@ class Rewriter:
 
     @chainable
     def add_selects(self, *selects, read=None):
-        select = self.expression.find(exp.Select)
-        for sql in selects:
-            select.args["expressions"].append(parse_one(sql, read=read))
+        self.expression.find(exp.Select).select(*selects, dialect=read)
         return self.expression
 
-
     @chainable
     def add_where(self, operator, where_condition, read=None):
         where = self.expression.find(exp.Where)
-        new_condition = parse_one(where_condition, read=read)
+        new_condition = exp.condition(where_condition, dialect=read)
         if where:
-            if operator.upper() == 'AND':
-                where.args['this'] = exp.And(this=new_condition, expression=where.args['this'])
-            elif operator.upper() == 'OR':
-                where.args['this'] = exp.Or(this=new_condition, expression=where.args['this'])
-
+            if operator.upper() == "AND":
+                where.set("this", exp.and_(new_condition, where.this))
+            elif operator.upper() == "OR":
+                where.set("this", exp.or_(new_condition, where.this))
         else:
-            where_expr = exp.Where(this=new_condition)
-            self.expression.args['where'] = where_expr
+            self.expression.set("where", exp.Where(this=new_condition))
         return self.expression
 
-
     @chainable
     def add_join(self, new_join, read=None):
-        # parse_one can't parse JOIN directly
-        join_sql = 'select fake from fake ' + new_join
-        new_join_expression = parse_one(join_sql, read=read).args['joins']
-        self.expression.args['joins'] += new_join_expression
-
+        self.expression.join(new_join, dialect=read)
         return self.expression
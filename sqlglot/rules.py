@@ -0,0 +1,358 @@
+# pylint: disable=protected-access
+import sqlglot.expressions as exp
+from sqlglot.expressions import _clone_node
+
+
+class _Any:
+    def __repr__(self):
+        return "ANY"
+
+
+# matches any value, including a missing argument
+ANY = _Any()
+
+
+class Pattern:
+    """
+    A tree pattern matching the nodes of a given type whose arguments match the given
+    sub-patterns, eg. `Pattern(exp.Cast, this=exp.Column, to=Pattern(exp.DataType, this=VARCHAR))`.
+
+    A sub-pattern can be:
+
+    - another :class:`Pattern`,
+    - an expression class, which matches its instances,
+    - a :class:`Capture`, which binds the matched value to a name,
+    - :data:`ANY`, which matches anything,
+    - a tuple of sub-patterns, which matches if one of them does,
+    - a list of sub-patterns, which matches a list argument item by item,
+    - a function, which is called with the value and matches if it returns a truthy value,
+    - any other value, which matches equal values. None matches a missing argument.
+
+    Args
+        expression_type (type|tuple): the expression class(es) of the matched nodes.
+        args: the sub-patterns of the arguments, arguments which aren't given match anything.
+    """
+
+    __slots__ = ("expression_type", "args")
+
+    def __init__(self, expression_type, **args):
+        self.expression_type = expression_type
+        self.args = args
+
+    def __repr__(self):
+        args = ", ".join(f"{k}={v!r}" for k, v in self.args.items())
+        return f"Pattern({_type_names(self.expression_type)}{', ' if args else ''}{args})"
+
+
+class Capture:
+    """
+    Binds the value matched by `pattern` to `name`, the bound values are passed to the
+    replacement function of the rule as keyword arguments.
+    """
+
+    __slots__ = ("name", "pattern")
+
+    def __init__(self, name, pattern=ANY):
+        self.name = name
+        self.pattern = pattern
+
+    def __repr__(self):
+        return f"Capture({self.name!r}, {self.pattern!r})"
+
+
+class Rule:
+    """
+    A rewrite rule, which replaces the nodes matched by a pattern.
+
+    Args
+        pattern: the pattern, see :class:`Pattern`.
+        replacement (function): called with the matched node and the captured values as
+            keyword arguments. It returns the new node, or None (or the node itself) to
+            leave it unchanged.
+        name (str): the name under which the rewrites are counted, defaults to the
+            name of the replacement function.
+    """
+
+    __slots__ = ("pattern", "replacement", "name", "expression_types", "match")
+
+    def __init__(self, pattern, replacement, name=None):
+        self.pattern = pattern
+        self.replacement = replacement
+        self.name = name or getattr(replacement, "__name__", None) or repr(pattern)
+        self.expression_types = _root_types(pattern)
+        self.match = _compile(pattern)
+
+    def __repr__(self):
+        return f"Rule({self.name})"
+
+    def apply(self, node):
+        captures = {}
+        if not self.match(node, captures):
+            return node
+        new_node = self.replacement(node, **captures)
+        return node if new_node is None else new_node
+
+
+class RuleSet:
+    """
+    A set of rewrite rules which are applied together in a single walk of the tree.
+
+    The rules are compiled into a dispatch table from node class to the rules whose
+    pattern can match nodes of that class, so every node is only tested against the
+    rules which concern it. Nodes are rewritten bottom-up: the children of a node are
+    rewritten before the node itself, and the first rule which changes a node wins for
+    the current pass. The nodes built by a replacement are not rewritten again in the
+    same pass, see the `fixpoint` argument of :meth:`apply`.
+
+    Rules must only depend on the subtree of the matched node, which lets the fixpoint
+    iteration skip the subtrees in which no rule fired during the previous pass.
+
+    Args
+        rules (Rule): the rules, in order of precedence.
+    """
+
+    __slots__ = ("rules", "_dispatch")
+
+    def __init__(self, *rules):
+        self.rules = []
+        self._dispatch = {}
+        for rule in rules:
+            self.add(rule)
+
+    def __len__(self):
+        return len(self.rules)
+
+    def __iter__(self):
+        return iter(self.rules)
+
+    def add(self, rule, replacement=None, name=None):
+        """
+        Adds a rule to the set.
+
+        Args
+            rule (Rule|Pattern): the rule, or a pattern if `replacement` is given.
+            replacement (function): the replacement function, see :class:`Rule`.
+            name (str): the name of the rule, see :class:`Rule`.
+
+        Returns
+            the added rule.
+        """
+        if not isinstance(rule, Rule):
+            rule = Rule(rule, replacement, name=name)
+        self.rules.append(rule)
+        self._dispatch = {}
+        return rule
+
+    def rule(self, pattern, name=None):
+        """
+        Decorator which adds a rule to the set with the decorated function as its
+        replacement.
+
+        Example:
+            >>> rules = RuleSet()
+            >>> @rules.rule(Pattern(exp.Paren, this=Capture("inner", exp.Column)))
+            ... def unwrap(node, inner):
+            ...     return inner
+            >>> rules.apply(sqlglot.parse_one("SELECT (a) FROM x")).sql()
+            'SELECT a FROM x'
+        """
+
+        def decorator(replacement):
+            self.add(pattern, replacement, name=name)
+            return replacement
+
+        return decorator
+
+    def rules_for(self, expression_class):
+        """
+        Returns the rules which may match nodes of the given class, in order of precedence.
+        """
+        rules = self._dispatch.get(expression_class)
+        if rules is None:
+            rules = tuple(r for r in self.rules if issubclass(expression_class, r.expression_types))
+            self._dispatch[expression_class] = rules
+        return rules
+
+    def apply(self, expression, copy=True, fixpoint=False, max_passes=100, changes=None):
+        """
+        Rewrites a tree with the rules of this set.
+
+        Args
+            expression (Expression): the tree.
+            copy (bool): if set to True the tree is copied first, otherwise it is modified in place.
+                Shared nodes (see :class:`~sqlglot.expressions.Interner`) are path copied either way.
+            fixpoint (bool): if set to True the tree is rewritten until no rule changes it anymore,
+                otherwise a single pass is made.
+            max_passes (int): the maximum number of passes of the fixpoint iteration.
+            changes (dict): if given, the number of rewrites made by each rule is added to it,
+                keyed by rule name.
+
+        Returns
+            the rewritten tree.
+
+        Raises
+            ValueError: if the fixpoint isn't reached within `max_passes` passes.
+        """
+        root = expression.copy() if copy else expression
+        node = root
+        stable = {}
+        passes = 0
+
+        while True:
+            passes += 1
+            fired = []
+            node = self._rewrite(node, stable, fired, changes)
+            if not fixpoint or not fired:
+                break
+            if passes >= max_passes:
+                raise ValueError(f"Rules didn't reach a fixpoint after {max_passes} passes")
+
+        if node is not root:
+            if root.parent is not None:
+                # the tree was rewritten in place, the new root takes the place of the old one
+                root.replace(node)
+            else:
+                node.parent = None
+                node.arg_key = None
+                node.arg_index = None
+
+        top = node._invalidate()
+        if top._index is not None:
+            top._index.clear()
+        return node
+
+    def _rewrite(self, node, stable, fired, changes):
+        """
+        Rewrites the subtree of node bottom-up and returns its new root. Every node whose
+        subtree is left unchanged is recorded in `stable`, which is keyed by node id and keeps
+        the nodes alive so that the ids can't be reused. `fired` gets an item for every rewrite.
+        """
+        if id(node) in stable:
+            return node
+
+        before = len(fired)
+        new_args = self._rewrite_args(node, stable, fired, changes)
+
+        if new_args:
+            if node.shared:
+                node = _clone_node(node)
+            for k, v in new_args:
+                node._set_arg(k, v)
+                node._set_parent(k, v)
+            node._hash = None
+            node._sql = None
+
+        for rule in self.rules_for(node.__class__):
+            new_node = rule.apply(node)
+            if new_node is not node:
+                fired.append(rule)
+                if changes is not None:
+                    changes[rule.name] = changes.get(rule.name, 0) + 1
+                return new_node
+
+        if len(fired) == before:
+            stable[id(node)] = node
+        return node
+
+    def _rewrite_args(self, node, stable, fired, changes):
+        """Rewrites the children of node and returns the (arg key, value) pairs which changed."""
+        new_args = []
+
+        for k, v in node._arg_items():
+            if isinstance(v, exp.Expression):
+                new_v = self._rewrite(v, stable, fired, changes)
+                if new_v is not v:
+                    new_args.append((k, new_v))
+            elif isinstance(v, list):
+                new_v = None
+                for i, child in enumerate(v):
+                    if not isinstance(child, exp.Expression):
+                        continue
+                    new_child = self._rewrite(child, stable, fired, changes)
+                    if new_child is not child:
+                        if new_v is None:
+                            new_v = list(v)
+                        new_v[i] = new_child
+                if new_v is not None:
+                    new_args.append((k, new_v))
+
+        return new_args
+
+
+def _compile(pattern):
+    """Compiles a pattern into a function of (value, captures) which returns whether it matches."""
+    if pattern is ANY:
+        return lambda value, captures: True
+
+    if isinstance(pattern, Capture):
+        name = pattern.name
+        match = _compile(pattern.pattern)
+
+        def match_capture(value, captures):
+            if match(value, captures):
+                captures[name] = value
+                return True
+            return False
+
+        return match_capture
+
+    if isinstance(pattern, Pattern):
+        expression_type = pattern.expression_type
+        args = tuple((k, _compile(v)) for k, v in pattern.args.items())
+
+        def match_pattern(value, captures):
+            if not isinstance(value, expression_type):
+                return False
+            get = value._get_arg
+            for k, match in args:
+                if not match(get(k), captures):
+                    return False
+            return True
+
+        return match_pattern
+
+    if isinstance(pattern, type):
+        return lambda value, captures: isinstance(value, pattern)
+
+    if isinstance(pattern, tuple):
+        alternatives = tuple(_compile(p) for p in pattern)
+        return lambda value, captures: any(match(value, captures) for match in alternatives)
+
+    if isinstance(pattern, list):
+        items = tuple(_compile(p) for p in pattern)
+
+        def match_list(value, captures):
+            if not isinstance(value, list) or len(value) != len(items):
+                return False
+            return all(match(v, captures) for match, v in zip(items, value))
+
+        return match_list
+
+    if callable(pattern):
+        return lambda value, captures: bool(pattern(value))
+
+    if pattern is None:
+        return lambda value, captures: value is None
+
+    return lambda value, captures: value == pattern
+
+
+def _root_types(pattern):
+    """Returns the tuple of expression classes of the nodes that a pattern can match."""
+    if isinstance(pattern, Capture):
+        return _root_types(pattern.pattern)
+    if isinstance(pattern, Pattern):
+        return _ensure_tuple(pattern.expression_type)
+    if isinstance(pattern, type) and issubclass(pattern, exp.Expression):
+        return (pattern,)
+    if isinstance(pattern, tuple):
+        return tuple(t for p in pattern for t in _root_types(p))
+    return (exp.Expression,)
+
+
+def _ensure_tuple(value):
+    return value if isinstance(value, tuple) else (value,)
+
+
+def _type_names(expression_type):
+    return "|".join(t.__name__ for t in _ensure_tuple(expression_type))
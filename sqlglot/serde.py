@@ -0,0 +1,301 @@
+# pylint: disable=protected-access
+import json
+
+import sqlglot.expressions as exp
+
+# Binary layout (all integers are unsigned LEB128 varints):
+#
+#   MAGIC | VERSION | class table | string table | tree
+#
+# The class table lists the registry keys of the node classes used in the tree and the
+# string table holds every distinct string once. The tree is a tagged encoding in which
+# nodes reference both tables by index, which keeps it compact and independent of the
+# registry ids of the running process.
+MAGIC = b"SQGL"
+VERSION = 1
+
+NODE = 0
+STRING = 1
+TRUE = 2
+FALSE = 3
+NONE = 4
+LIST = 5
+TUPLE = 6
+INT = 7
+DATA_TYPE = 8
+
+
+def dump(expression):
+    """
+    Serializes a syntax tree into the compact binary format.
+
+    Args
+        expression (Expression): the syntax tree.
+
+    Returns
+        the serialized bytes.
+    """
+    encoder = _Encoder()
+    encoder.encode(expression)
+
+    out = bytearray(MAGIC)
+    out.append(VERSION)
+    _write_table(out, encoder.classes)
+    _write_table(out, encoder.strings)
+    out += encoder.out
+    return bytes(out)
+
+
+def load(data):
+    """
+    Deserializes a syntax tree produced by :func:`dump`.
+
+    Args
+        data (bytes): the serialized bytes.
+
+    Returns
+        the syntax tree.
+    """
+    data = memoryview(data)
+    if bytes(data[: len(MAGIC)]) != MAGIC:
+        raise ValueError("Invalid serialized expression: bad magic")
+
+    version = data[len(MAGIC)]
+    if version != VERSION:
+        raise ValueError(f"Unsupported serialized expression version {version}")
+
+    decoder = _Decoder(data, len(MAGIC) + 1)
+    decoder.classes = [_expression_class(key) for key in decoder.read_table()]
+    decoder.strings = decoder.read_table()
+    return decoder.decode()
+
+
+def dump_json(expression):
+    """
+    Serializes a syntax tree into a JSON string.
+
+    Args
+        expression (Expression): the syntax tree.
+
+    Returns
+        the JSON string.
+    """
+    return json.dumps({"version": VERSION, "expression": _to_json(expression)})
+
+
+def load_json(data):
+    """
+    Deserializes a syntax tree produced by :func:`dump_json`.
+
+    Args
+        data (str): the JSON string.
+
+    Returns
+        the syntax tree.
+    """
+    obj = json.loads(data)
+    if obj.get("version") != VERSION:
+        raise ValueError(f"Unsupported serialized expression version {obj.get('version')}")
+    return _from_json(obj["expression"])
+
+
+class _Encoder:
+    __slots__ = ("out", "classes", "strings")
+
+    def __init__(self):
+        self.out = bytearray()
+        self.classes = {}
+        self.strings = {}
+
+    def encode(self, value):
+        out = self.out
+        # the values which are left to encode, along with their arg key, which precedes
+        # them if they're arguments of a node
+        stack = [(None, value)]
+
+        while stack:
+            key, value = stack.pop()
+            if key is not None:
+                _write_varint(out, _table_id(self.strings, key))
+
+            if isinstance(value, exp.Expression):
+                out.append(NODE)
+                items = value._arg_items()
+                _write_varint(out, _table_id(self.classes, value.key))
+                _write_varint(out, len(items))
+                stack.extend(reversed(items))
+            elif isinstance(value, str):
+                out.append(STRING)
+                _write_varint(out, _table_id(self.strings, value))
+            elif value is True:
+                out.append(TRUE)
+            elif value is False:
+                out.append(FALSE)
+            elif value is None:
+                out.append(NONE)
+            elif isinstance(value, (list, tuple)):
+                out.append(LIST if isinstance(value, list) else TUPLE)
+                _write_varint(out, len(value))
+                stack.extend((None, v) for v in reversed(value))
+            elif isinstance(value, int):
+                out.append(INT)
+                _write_varint(out, value << 1 if value >= 0 else (-value << 1) - 1)
+            elif isinstance(value, exp.DataType.Type):
+                out.append(DATA_TYPE)
+                _write_varint(out, _table_id(self.strings, value.value))
+            else:
+                raise ValueError(f"Cannot serialize value of type {type(value).__name__}")
+
+
+class _Decoder:
+    __slots__ = ("data", "pos", "classes", "strings")
+
+    def __init__(self, data, pos):
+        self.data = data
+        self.pos = pos
+        self.classes = None
+        self.strings = None
+
+    def read_varint(self):
+        data = self.data
+        result = 0
+        shift = 0
+        while True:
+            byte = data[self.pos]
+            self.pos += 1
+            result |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return result
+            shift += 7
+
+    def read_table(self):
+        table = []
+        for _ in range(self.read_varint()):
+            size = self.read_varint()
+            table.append(str(self.data[self.pos : self.pos + size], "utf-8"))
+            self.pos += size
+        return table
+
+    def decode(self):
+        # the nodes and lists which are being read, as [value, items left, tag, arg key] frames,
+        # the arg key is the one under which the value is stored in the node below it
+        stack = []
+        key = None
+
+        while True:
+            if stack and stack[-1][2] == NODE:
+                key = self.strings[self.read_varint()]
+
+            tag = self.data[self.pos]
+            self.pos += 1
+
+            if tag in (NODE, LIST, TUPLE):
+                value = self.classes[self.read_varint()]() if tag == NODE else []
+                size = self.read_varint()
+                if size:
+                    stack.append([value, size, tag, key])
+                    continue
+                if tag == TUPLE:
+                    value = ()
+            else:
+                value = self.decode_scalar(tag)
+
+            # the value is complete, it's added to the values below it which it completes
+            while stack:
+                frame = stack[-1]
+                parent = frame[0]
+                if frame[2] == NODE:
+                    parent._set_arg(key, value)
+                    parent._set_parent(key, value)
+                else:
+                    parent.append(value)
+
+                frame[1] -= 1
+                if frame[1]:
+                    break
+                stack.pop()
+                value = tuple(parent) if frame[2] == TUPLE else parent
+                key = frame[3]
+            else:
+                return value
+
+    def decode_scalar(self, tag):
+        if tag == STRING:
+            return self.strings[self.read_varint()]
+        if tag == TRUE:
+            return True
+        if tag == FALSE:
+            return False
+        if tag == NONE:
+            return None
+        if tag == INT:
+            value = self.read_varint()
+            return -((value + 1) >> 1) if value & 1 else value >> 1
+        if tag == DATA_TYPE:
+            return exp.DataType.Type(self.strings[self.read_varint()])
+        raise ValueError(f"Invalid serialized expression: unknown tag {tag}")
+
+
+def _to_json(value):
+    if isinstance(value, exp.Expression):
+        return {
+            "class": value.key,
+            "args": {k: _to_json(v) for k, v in value._arg_items()},
+        }
+    if isinstance(value, list):
+        return [_to_json(v) for v in value]
+    if isinstance(value, tuple):
+        return {"tuple": [_to_json(v) for v in value]}
+    if isinstance(value, exp.DataType.Type):
+        return {"type": value.value}
+    if value is None or isinstance(value, (str, bool, int)):
+        return value
+    raise ValueError(f"Cannot serialize value of type {type(value).__name__}")
+
+
+def _from_json(value):
+    if isinstance(value, list):
+        return [_from_json(v) for v in value]
+    if not isinstance(value, dict):
+        return value
+    if "tuple" in value:
+        return tuple(_from_json(v) for v in value["tuple"])
+    if "type" in value:
+        return exp.DataType.Type(value["type"])
+
+    node = _expression_class(value["class"])()
+    for k, v in value["args"].items():
+        v = _from_json(v)
+        node._set_arg(k, v)
+        node._set_parent(k, v)
+    return node
+
+
+def _expression_class(key):
+    cls = exp.Expression.get(key, None)
+    if cls is None:
+        raise ValueError(f"Unknown expression class '{key}'")
+    return cls
+
+
+def _table_id(table, value):
+    table_id = table.get(value)
+    if table_id is None:
+        table_id = len(table)
+        table[value] = table_id
+    return table_id
+
+
+def _write_table(out, table):
+    _write_varint(out, len(table))
+    for value in table:
+        encoded = value.encode("utf-8")
+        _write_varint(out, len(encoded))
+        out += encoded
+
+
+def _write_varint(out, value):
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
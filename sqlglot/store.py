@@ -0,0 +1,225 @@
+import mmap
+import os
+import struct
+import zlib
+
+import sqlglot.expressions as exp
+from sqlglot.serde import dump, load
+
+# Data file layout:
+#
+#   MAGIC | VERSION | record*
+#   record: u32 size | kind bitmap | u16 id size | query id | serialized tree
+#
+# where size covers everything after the size field itself. The index file is a
+# sequence of (u16 id size, query id, u64 record offset) entries. Both files are
+# only ever appended to, the last record written for a query id wins.
+MAGIC = b"SQGS"
+VERSION = 1
+KIND_BITS = 256
+
+_HEADER = MAGIC + bytes([VERSION])
+_SIZE = struct.Struct("<I")
+_ID_SIZE = struct.Struct("<H")
+_OFFSET = struct.Struct("<Q")
+_BITMAP_SIZE = KIND_BITS // 8
+
+
+class ASTStore:
+    """
+    Append-only on-disk store of serialized syntax trees keyed by query id.
+
+    Reads go through a memory map of the data file, so lookups and scans only decode the
+    trees they return. Every record carries a bitmap of the node kinds that appear in its
+    tree, which lets :meth:`scan` skip the trees that cannot contain the requested kinds
+    without decoding them. Kinds are hashed by their registry key into the bitmap, so it
+    may report false positives (which are filtered out after decoding) but never misses.
+
+    Args
+        path (str): the path of the data file. The index is kept next to it in `path + ".idx"`.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.index_path = path + ".idx"
+        self._offsets = {}
+        self._mmap = None
+
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        self._data = open(path, "a+b")  # pylint: disable=consider-using-with
+
+        if not exists:
+            self._data.write(_HEADER)
+            self._data.flush()
+        else:
+            self._data.seek(0)
+            if self._data.read(len(_HEADER)) != _HEADER:
+                self._data.close()
+                raise ValueError(f"Invalid or unsupported AST store file '{path}'")
+
+        if exists and not os.path.exists(self.index_path):
+            self._rebuild_index()
+        else:
+            self._read_index()
+
+        self._index = open(self.index_path, "ab")  # pylint: disable=consider-using-with
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __contains__(self, query_id):
+        return query_id in self._offsets
+
+    def close(self):
+        # the map is released once the memory views handed out by scans are gone
+        self._mmap = None
+        self._data.close()
+        self._index.close()
+
+    def ids(self):
+        """
+        Returns the stored query ids in insertion order.
+        """
+        return list(self._offsets)
+
+    def append(self, query_id, expression):
+        """
+        Appends a syntax tree to the store.
+
+        Args
+            query_id (str): the id under which the tree is stored.
+            expression (Expression): the syntax tree.
+        """
+        encoded_id = query_id.encode("utf-8")
+        payload = dump(expression)
+        size = _BITMAP_SIZE + _ID_SIZE.size + len(encoded_id) + len(payload)
+
+        self._data.seek(0, os.SEEK_END)
+        offset = self._data.tell()
+        self._data.write(_SIZE.pack(size))
+        self._data.write(_kind_bitmap(node.key for node in expression.find_all(exp.Expression)))
+        self._data.write(_ID_SIZE.pack(len(encoded_id)))
+        self._data.write(encoded_id)
+        self._data.write(payload)
+        self._data.flush()
+
+        self._index.write(_ID_SIZE.pack(len(encoded_id)) + encoded_id + _OFFSET.pack(offset))
+        self._index.flush()
+        self._offsets[query_id] = offset
+
+    def get(self, query_id):
+        """
+        Returns the syntax tree stored for the given query id.
+
+        Args
+            query_id (str): the query id.
+
+        Returns
+            the syntax tree.
+
+        Raises
+            KeyError: if the query id is not in the store.
+        """
+        data = self._view()
+        offset = self._offsets[query_id]
+        size = _SIZE.unpack_from(data, offset)[0]
+        id_size = _ID_SIZE.unpack_from(data, offset + _SIZE.size + _BITMAP_SIZE)[0]
+        start = offset + _SIZE.size + _BITMAP_SIZE + _ID_SIZE.size + id_size
+        return load(data[start : offset + _SIZE.size + size])
+
+    def scan(self, *expression_types):
+        """
+        Sequentially scans all records of the store.
+
+        Args
+            expression_types (type): if given, only the trees which contain a node of one of
+                these types are decoded and returned.
+
+        Returns
+            a generator of (query id, syntax tree) tuples, in insertion order. Trees which
+            were overwritten by a later record with the same query id are skipped.
+        """
+        mask = _kind_mask(expression_types) if expression_types else None
+        data = self._view()
+        offset = len(_HEADER)
+        end = len(data)
+
+        while offset < end:
+            size = _SIZE.unpack_from(data, offset)[0]
+            record_end = offset + _SIZE.size + size
+            pos = offset + _SIZE.size
+
+            if mask is None or int.from_bytes(data[pos : pos + _BITMAP_SIZE], "little") & mask:
+                pos += _BITMAP_SIZE
+                id_size = _ID_SIZE.unpack_from(data, pos)[0]
+                pos += _ID_SIZE.size
+                query_id = str(data[pos : pos + id_size], "utf-8")
+
+                if self._offsets.get(query_id) == offset:
+                    expression = load(data[pos + id_size : record_end])
+                    if mask is None or expression.find(*expression_types):
+                        yield query_id, expression
+
+            offset = record_end
+
+    def _view(self):
+        size = os.path.getsize(self.path)
+        if self._mmap is None or len(self._mmap) != size:
+            self._mmap = mmap.mmap(self._data.fileno(), size, access=mmap.ACCESS_READ)
+        return memoryview(self._mmap)
+
+    def _read_index(self):
+        if not os.path.exists(self.index_path):
+            return
+
+        with open(self.index_path, "rb") as index:
+            data = index.read()
+
+        pos = 0
+        while pos < len(data):
+            id_size = _ID_SIZE.unpack_from(data, pos)[0]
+            pos += _ID_SIZE.size
+            query_id = data[pos : pos + id_size].decode("utf-8")
+            pos += id_size
+            self._offsets[query_id] = _OFFSET.unpack_from(data, pos)[0]
+            pos += _OFFSET.size
+
+    def _rebuild_index(self):
+        data = self._view()
+        offset = len(_HEADER)
+
+        with open(self.index_path, "wb") as index:
+            while offset < len(data):
+                size = _SIZE.unpack_from(data, offset)[0]
+                pos = offset + _SIZE.size + _BITMAP_SIZE
+                id_size = _ID_SIZE.unpack_from(data, pos)[0]
+                pos += _ID_SIZE.size
+                encoded_id = bytes(data[pos : pos + id_size])
+                index.write(_ID_SIZE.pack(id_size) + encoded_id + _OFFSET.pack(offset))
+                self._offsets[encoded_id.decode("utf-8")] = offset
+                offset += _SIZE.size + size
+
+
+def _kind_bit(key):
+    return 1 << (zlib.crc32(key.encode("utf-8")) % KIND_BITS)
+
+
+def _kind_bitmap(keys):
+    bitmap = 0
+    for key in set(keys):
+        bitmap |= _kind_bit(key)
+    return bitmap.to_bytes(_BITMAP_SIZE, "little")
+
+
+def _kind_mask(expression_types):
+    mask = 0
+    for cls in exp._Expression.ids:  # pylint: disable=protected-access
+        if issubclass(cls, expression_types):
+            mask |= _kind_bit(cls.__name__.lower())
+    return mask
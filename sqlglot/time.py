@@ -1,39 +1,98 @@
 # the generic time format is based on python time.strftime
 # https://docs.python.org/3/library/time.html#time.strftime
-from sqlglot.trie import in_trie, new_trie
+from functools import lru_cache
+
+from sqlglot.trie import new_trie
+
+# the number of compiled mappings and of translated strings per mapping which are kept
+MAX_TRANSLATORS = 64
+MAX_FORMATS = 256
+
+_translators = {}
 
 
 def format_time(string, mapping, trie=None):
     """
     Converts a time string given a mapping.
 
+    The mapping is compiled into a :class:`TimeTranslator` the first time it's used, which is
+    reused for as long as the mapping isn't modified.
+
     mapping: Dictionary of time format to target time format
     trie: Optional trie, can be passed in for performance
     """
-    start = 0
-    end = 1
-    size = len(string)
-    trie = trie or new_trie(mapping)
-    chunks = []
-    sym = None
-
-    while end <= size:
-        chars = string[start:end]
-        result = in_trie(trie, chars)
-
-        if result == 0:
-            if sym:
-                end -= 1
-                chars = sym
-                sym = None
-            start += len(chars)
-            chunks.append(chars)
-        elif result == 2:
-            sym = chars
-
-        end += 1
-
-        if result and end > size:
-            chunks.append(chars)
-
-    return "".join(mapping.get(chars, chars) for chars in chunks)
+    return translator(mapping, trie).translate(string)
+
+
+def translator(mapping, trie=None):
+    """
+    Returns the compiled :class:`TimeTranslator` of a mapping.
+    """
+    key = id(mapping)
+    entry = _translators.get(key)
+    # the mapping is kept alive so that its id isn't reused, and compared to the copy it
+    # was compiled from in case it was modified in place
+    if entry is not None and entry[0] is mapping and entry[1].mapping == mapping:
+        return entry[1]
+
+    if len(_translators) >= MAX_TRANSLATORS:
+        # the mappings of the dialects are compiled again on their next use
+        _translators.clear()
+    compiled = TimeTranslator(mapping, trie)
+    _translators[key] = (mapping, compiled)
+    return compiled
+
+
+class TimeTranslator:
+    """
+    Translates time format strings from one convention to another in a single pass over the
+    string, replacing the longest format element of the mapping at every position. The most
+    recent translations are memoized, as a handful of distinct format strings is usually used.
+
+    Example:
+        >>> TimeTranslator({"yyyy": "%Y", "MM": "%m", "dd": "%d"}).translate("yyyy-MM-dd")
+        '%Y-%m-%d'
+
+    Args
+        mapping (dict): the dictionary of time format element to target time format element.
+        trie (dict): the trie of the keys of the mapping, built if not given.
+    """
+
+    __slots__ = ("mapping", "trie", "translate")
+
+    def __init__(self, mapping, trie=None):
+        self.mapping = dict(mapping)
+        self.trie = trie or new_trie(self.mapping)
+        self.translate = lru_cache(maxsize=MAX_FORMATS)(self._translate)
+
+    def _translate(self, string):
+        mapping = self.mapping
+        trie = self.trie
+        size = len(string)
+        chunks = []
+        start = 0
+
+        while start < size:
+            node = trie
+            end = start
+            match = 0
+
+            while end < size:
+                node = node.get(string[end])
+                if node is None:
+                    break
+                end += 1
+                if 0 in node:
+                    match = end
+
+            if match:
+                chunks.append(mapping[string[start:match]])
+                start = match
+            else:
+                # a prefix which doesn't complete an element is kept as is, along with the
+                # character which ended it, eg. %% isn't read as % followed by %Y
+                end = min(end + 1, size)
+                chunks.append(string[start:end])
+                start = end
+
+        return "".join(chunks)
@@ -0,0 +1,83 @@
+import copy
+import threading
+
+from sqlglot.dialects import Dialect
+
+
+class Transpiler:
+    """
+    A reusable transpilation session from a source dialect to a target dialect.
+
+    The tokenizer, the parser and the generator of the dialects, along with their merged
+    function, transform and type mapping tables, are built once when the session is created.
+    Every thread then works on its own shallow copy of them, which shares these tables and holds
+    the per-call state, so a single session can be used concurrently, eg. from a thread pool.
+
+    Example:
+        >>> transpiler = Transpiler(read="presto", write="spark")
+        >>> transpiler.transpile("SELECT CAST(a AS VARCHAR) FROM x")
+        ['SELECT CAST(a AS STRING) FROM x']
+
+    Args
+        read (str): the source dialect used to parse the input strings
+            (eg. "spark", "hive", "presto", "mysql").
+        write (str): the target dialect into which the input is transformed.
+        identity (bool): if set to True and if the target dialect is not specified
+            the source dialect will be used as both: the source and the target dialect.
+        error_level (ErrorLevel): the desired error level of the parser.
+        opts (dict): other options of the generator, see :class:`~sqlglot.generator.Generator`.
+    """
+
+    __slots__ = ("read", "write", "_tokenizer", "_parser", "_generator", "_local")
+
+    def __init__(self, read=None, write=None, identity=True, error_level=None, **opts):
+        write = write or read if identity else write
+        self.read = Dialect.get_or_raise(read)()
+        self.write = Dialect.get_or_raise(write)()
+        self._tokenizer = self.read.tokenizer()
+        self._parser = self.read.parser(error_level=error_level)
+        self._generator = self.write.generator(**opts)
+        self._local = threading.local()
+
+    def parse(self, code):
+        """
+        Parses the given SQL string into a list of syntax trees, one per statement.
+        """
+        local = self._local
+        tokenizer = getattr(local, "tokenizer", None) or _fork(self._tokenizer)
+        parser = getattr(local, "parser", None) or _fork(self._parser)
+        # the instances are only kept once they're done with the call, an error may leave
+        # them half way through it
+        local.tokenizer = local.parser = None
+        expressions = parser.parse(tokenizer.tokenize(code), code)
+        local.tokenizer = tokenizer
+        local.parser = parser
+        return expressions
+
+    def generate(self, expression):
+        """
+        Generates the SQL string of the given syntax tree in the target dialect.
+        """
+        local = self._local
+        generator = getattr(local, "generator", None) or _fork(self._generator)
+        local.generator = None
+        sql = generator.generate(expression)
+        local.generator = generator
+        return sql
+
+    def transpile(self, code):
+        """
+        Transpiles the given SQL string, see :func:`sqlglot.transpile`.
+
+        Returns
+            the list of transpiled SQL statements.
+        """
+        return [self.generate(expression) for expression in self.parse(code)]
+
+
+def _fork(instance):
+    """Returns a copy of a tokenizer, parser or generator which shares its configuration."""
+    instance = copy.copy(instance)
+    if hasattr(instance, "reset"):
+        instance.reset()
+    return instance
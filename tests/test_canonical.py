@@ -0,0 +1,92 @@
+import os
+import unittest
+
+import sqlglot.expressions as exp
+from sqlglot import canonicalize, parse_one
+
+
+class TestCanonical(unittest.TestCase):
+    fixtures_dir = os.path.join(os.path.dirname(__file__), "fixtures")
+
+    def validate(self, sql, expected=None):
+        canonical = canonicalize(parse_one(sql))
+        if expected is not None:
+            self.assertEqual(canonical.sql(), expected)
+        # the canonical form is a fixpoint and round trips through the parser
+        self.assertEqual(parse_one(canonical.sql()), canonical)
+        self.assertEqual(canonicalize(canonical).sql(), canonical.sql())
+
+    def test_equivalent(self):
+        for first, second in [
+            (
+                "SELECT x.b AS c FROM t AS x WHERE (x.a = 1) AND (x.c > 2)",
+                "SELECT y.b AS d FROM t AS y WHERE y.c > 2 AND 1 = y.a",
+            ),
+            ("SELECT a + (b + c) FROM t", "SELECT (c + a) + b FROM t"),
+            ("SELECT * FROM t WHERE a OR (b OR c)", "SELECT * FROM t WHERE c OR b OR a"),
+            ("SELECT a * b, c <> d FROM t", "SELECT b * a, d <> c FROM t"),
+            (
+                "WITH q AS (SELECT 1 AS v) SELECT q.v FROM q",
+                "WITH r AS (SELECT 1 AS v) SELECT R.v FROM r",
+            ),
+        ]:
+            with self.subTest(first):
+                first, second = canonicalize(parse_one(first)), canonicalize(parse_one(second))
+                self.assertEqual(first.sql(), second.sql())
+                self.assertEqual(first, second)
+                self.assertEqual(hash(first), hash(second))
+
+    def test_parens(self):
+        self.validate(
+            "SELECT ((a)), (a * b) + c, (a - b) - c, a - (b - c), (a + b) * c FROM t",
+            "SELECT a, c + a * b, a - b - c, a - (b - c), (a + b) * c FROM t",
+        )
+        self.validate(
+            "SELECT NOT (a = b), COUNT((x)), (SELECT 1) FROM t WHERE (a OR b) AND ((c))",
+            "SELECT NOT (a = b), COUNT(x), (SELECT 1) FROM t WHERE (a OR b) AND c",
+        )
+        self.validate("SELECT a FROM t ORDER BY (1), (a)", "SELECT a FROM t ORDER BY (1), a")
+
+    def test_precedence(self):
+        self.validate("SELECT * FROM t WHERE z OR y AND x", "SELECT * FROM t WHERE (y OR z) AND x")
+        self.validate("SELECT a - b + c FROM t", "SELECT (a - b) + c FROM t")
+        self.validate(
+            "SELECT * FROM t WHERE a = b AND c OR d AND e",
+            "SELECT * FROM t WHERE e AND (a = b AND c OR d)",
+        )
+
+        with open(os.path.join(self.fixtures_dir, "identity.sql"), encoding="utf-8") as f:
+            for sql in filter(None, map(str.strip, f)):
+                with self.subTest(sql):
+                    self.validate(sql)
+
+    def test_aliases(self):
+        self.validate(
+            "SELECT s.x AS y FROM (SELECT a AS x FROM t) AS s ORDER BY y",
+            "SELECT _t0.x AS _c0 FROM (SELECT a AS x FROM t) AS _t0 ORDER BY _c0",
+        )
+        # an alias which is referred to outside ORDER BY keeps its name
+        self.validate(
+            "SELECT a AS x, b AS y FROM t GROUP BY x HAVING COUNT(y) > 1 ORDER BY x, y",
+            "SELECT a AS x, b AS y FROM t GROUP BY x HAVING COUNT(y) > 1 ORDER BY x, y",
+        )
+        self.assertNotEqual(
+            canonicalize(parse_one("SELECT a AS x FROM t GROUP BY x")),
+            canonicalize(parse_one("SELECT a AS y FROM t GROUP BY x")),
+        )
+        self.validate(
+            "SELECT a AS y FROM t WHERE x > 1 GROUP BY x",
+            "SELECT a AS _c0 FROM t WHERE x > 1 GROUP BY x",
+        )
+        # b is also the name of a table
+        self.validate(
+            "SELECT * FROM a AS b JOIN b AS c ON b.x = c.x",
+            "SELECT * FROM a AS b JOIN b AS _t0 ON _t0.x = b.x",
+        )
+
+    def test_copy(self):
+        expression = parse_one("SELECT (a) FROM t AS x")
+        canonicalize(expression)
+        self.assertEqual(expression.sql(), "SELECT (a) FROM t AS x")
+        self.assertEqual(canonicalize(expression, copy=False).sql(), "SELECT a FROM t AS _t0")
+        self.assertEqual(expression.find(exp.Alias).alias.this, "_t0")
@@ -1,7 +1,8 @@
 # pylint: disable=too-many-statements
 import unittest
 
-from sqlglot import ErrorLevel, UnsupportedError, transpile
+import sqlglot.expressions as exp
+from sqlglot import ErrorLevel, UnsupportedError, parse_one, transpile
 
 
 class TestDialects(unittest.TestCase):
@@ -1075,3 +1076,14 @@ class TestDialects(unittest.TestCase):
             read="sqlite",
             write="oracle",
         )
+
+    def test_time_format_literal(self):
+        first = parse_one("DATE_FORMAT(a, 'yyyy-MM-dd')", read="hive")
+        second = parse_one("SELECT DATE_FORMAT(b, 'yyyy-MM-dd')", read="hive")
+        literal = first.args["format"]
+
+        self.assertEqual(literal.this, "%Y-%m-%d")
+        self.assertIs(second.find(exp.TimeToStr).args["format"], literal)
+        self.assertTrue(literal.shared)
+        self.assertEqual(first.sql("presto"), "DATE_FORMAT(a, '%Y-%m-%d')")
+        self.assertFalse(first.copy().args["format"].shared)
@@ -1,7 +1,10 @@
+import gc
+import pickle
 import unittest
+import weakref
 
 import sqlglot.expressions as exp
-from sqlglot import parse_one
+from sqlglot import parse_one, transpile
 
 
 class TestExpressions(unittest.TestCase):
@@ -37,7 +40,7 @@ class TestExpressions(unittest.TestCase):
                 table.args["this"].args["this"]
                 for table in expression.find_all(exp.Table)
             ],
-            ["y", "x"],
+            ["x", "y"],
         )
 
     def test_find_all(self):
@@ -70,7 +73,53 @@ class TestExpressions(unittest.TestCase):
                 table.args["this"].args["this"]
                 for table in expression.find_all(exp.Table)
             ],
-            ["d", "c", "b"],
+            ["b", "c", "d"],
+        )
+
+        self.assertEqual(
+            [
+                table.args["this"].args["this"]
+                for table in expression.find_all(
+                    exp.Table, prune=lambda node, *_: isinstance(node, exp.Join)
+                )
+            ],
+            ["b"],
+        )
+
+    def test_walk(self):
+        expression = parse_one("SELECT a + 1, (SELECT b FROM y) FROM x")
+
+        self.assertEqual(
+            [node.key for node, _, _ in expression.walk() if isinstance(node, exp.Expression)],
+            [
+                "select", "add", "paren", "from", "column", "literal", "select", "table",
+                "identifier", "column", "from", "identifier", "identifier", "table", "identifier",
+            ],
+        )
+        self.assertEqual(
+            [node.key for node, _, _ in expression.walk(bfs=False) if isinstance(node, exp.Expression)],
+            [
+                "select", "add", "column", "identifier", "literal", "paren", "select", "column",
+                "identifier", "from", "table", "identifier", "from", "table", "identifier",
+            ],
+        )
+
+        for node, parent, key in expression.walk(bfs=False):
+            if isinstance(node, exp.Expression) and node is not expression:
+                self.assertIs(node.parent, parent)
+                self.assertEqual(node.arg_key, key)
+
+        def prune(node, parent, _key):
+            return isinstance(node, exp.Select) and parent is not None
+
+        self.assertEqual(
+            [c.text("this") for c in expression.find_all(exp.Column, prune=prune)], ["a"]
+        )
+        self.assertEqual(
+            [c.text("this") for c in expression.find_all(exp.Column, bfs=False)], ["a", "b"]
+        )
+        self.assertEqual(
+            [node for node, _, _ in expression.walk(prune=lambda *_: True)], [expression]
         )
 
     def test_hash(self):
@@ -89,6 +138,105 @@ class TestExpressions(unittest.TestCase):
             },
         )
 
+    def test_hash_cache(self):
+        expression = parse_one("SELECT a, b + 1 FROM x")
+        column = expression.args["expressions"][0]
+        original = hash(expression)
+        self.assertEqual(hash(expression), original)
+        self.assertEqual(hash(parse_one("SELECT a, b + 1 FROM x")), original)
+        self.assertEqual(
+            exp.Column(this="a", comment="b", alias="c"),
+            exp.Column(this="a", alias="c", comment="b"),
+        )
+
+        column.set("table", exp.Identifier(this="y"))
+        self.assertNotEqual(hash(expression), original)
+        self.assertEqual(expression, parse_one("SELECT y.a, b + 1 FROM x"))
+
+        expression.append("expressions", parse_one("c"))
+        self.assertEqual(expression, parse_one("SELECT y.a, b + 1, c FROM x"))
+
+        expression.set("where", parse_one("SELECT 1 WHERE z").args["where"])
+        self.assertEqual(expression, parse_one("SELECT y.a, b + 1, c FROM x WHERE z"))
+
+        transformed = expression.transform(
+            lambda n: exp.Literal.number(2) if isinstance(n, exp.Literal) else n,
+            copy=False,
+        )
+        self.assertEqual(transformed, parse_one("SELECT y.a, b + 2, c FROM x WHERE z"))
+
+    def test_copy(self):
+        expression = parse_one("INSERT OVERWRITE TABLE a.b PARTITION(ds='YYYY-MM-DD') SELECT x + 1 FROM y")
+        select = expression.args["expression"]
+        copy = select.copy()
+
+        self.assertEqual(copy, select)
+        self.assertIsNot(copy, select)
+        self.assertIsNone(copy.parent)
+        self.assertIsNone(copy.arg_key)
+        self.assertIs(select.parent, expression)
+
+        for node, parent, key in copy.walk():
+            if isinstance(node, exp.Expression) and node is not copy:
+                self.assertIs(node.parent, parent)
+                self.assertEqual(node.arg_key, key)
+
+        copy.find(exp.Literal).set("this", "2")
+        self.assertEqual(select.sql(), "SELECT x + 1 FROM y")
+        self.assertEqual(copy.sql(), "SELECT x + 2 FROM y")
+        self.assertEqual(expression.copy().sql(), expression.sql())
+
+    def test_index(self):
+        expression = parse_one("SELECT a, b + 1 FROM x WHERE c > 2").enable_index()
+
+        def columns():
+            return sorted(c.text("this") for c in expression.find_all(exp.Column))
+
+        self.assertEqual(columns(), ["a", "b", "c"])
+        self.assertIs(expression.find(exp.Select), expression)
+        self.assertEqual(len(list(expression.find_all(exp.Binary))), 2)
+
+        expression.set("where", parse_one("SELECT 1 WHERE d = e").args["where"])
+        self.assertEqual(columns(), ["a", "b", "d", "e"])
+
+        expression.append("expressions", parse_one("f"))
+        self.assertEqual(columns(), ["a", "b", "d", "e", "f"])
+
+        expression.set("where", None)
+        self.assertEqual(columns(), ["a", "b", "f"])
+        self.assertIsNone(expression.find(exp.Where))
+
+        expression.transform(
+            lambda n: exp.Column(this=exp.Identifier(this="z"))
+            if isinstance(n, exp.Literal)
+            else n,
+            copy=False,
+        )
+        self.assertEqual(columns(), ["a", "b", "f", "z"])
+        self.assertIsNone(expression.find(exp.Literal))
+
+        # the matches come in the order of the walk rather than the order of insertion
+        expression = parse_one("SELECT b + 1 FROM x").enable_index()
+        self.assertEqual(expression.find(exp.Column).text("this"), "b")
+        expression.set("where", parse_one("SELECT 1 WHERE c > 2").args["where"])
+        expression.append("expressions", parse_one("a"))
+        self.assertEqual(expression.find(exp.Column).text("this"), "a")
+        self.assertEqual(expression.find(exp.Column, bfs=False).text("this"), "b")
+        for bfs in (True, False):
+            self.assertEqual(
+                list(expression.find_all(exp.Column, exp.Literal, bfs=bfs)),
+                list(expression.copy().find_all(exp.Column, exp.Literal, bfs=bfs)),
+            )
+
+        # interned nodes are found once per place they occur at, as the walk finds them
+        sql = "SELECT a, a, CAST(b AS INT) FROM x WHERE a = 1"
+        expression = parse_one(sql, intern=True)
+        walked = {bfs: list(expression.find_all(exp.Column, bfs=bfs)) for bfs in (True, False)}
+        self.assertEqual(len(walked[True]), 4)
+        expression.enable_index()
+        for bfs in (True, False):
+            self.assertEqual(list(expression.find_all(exp.Column, bfs=bfs)), walked[bfs])
+
     def test_sql(self):
         assert parse_one("x + y * 2").sql() == "x + y * 2"
         assert (
@@ -132,6 +280,59 @@ class TestExpressions(unittest.TestCase):
         # with self.assertRaises(ValueError):
         #     parse_one("a").transform(lambda n: None)
 
+    def test_transform_persistent(self):
+        expression = parse_one("SELECT a, b + 1 FROM x WHERE c > 2")
+        original_sql = expression.sql()
+
+        def fun(node):
+            if isinstance(node, exp.Literal) and node.this == "1":
+                return exp.Literal.number(10)
+            return node
+
+        transformed = expression.transform(fun, persistent=True)
+        self.assertEqual(transformed.sql(), "SELECT a, b + 10 FROM x WHERE c > 2")
+        self.assertEqual(expression.sql(), original_sql)
+        self.assertIsNot(transformed, expression)
+
+        self.assertIs(transformed.args["from"], expression.args["from"])
+        self.assertIs(transformed.args["where"], expression.args["where"])
+        self.assertIs(transformed.args["expressions"][0], expression.args["expressions"][0])
+        self.assertIsNot(transformed.args["expressions"][1], expression.args["expressions"][1])
+        self.assertIs(
+            transformed.args["expressions"][1].this,
+            expression.args["expressions"][1].this,
+        )
+
+        literal = transformed.args["expressions"][1].args["expression"]
+        self.assertEqual(literal.this, "10")
+        self.assertIs(literal.parent.parent, transformed)
+        self.assertEqual(literal.depth, 2)
+        self.assertIs(expression.args["where"].parent, expression)
+
+        self.assertIs(expression.transform(lambda n: n, persistent=True), expression)
+
+        # the lists which are unchanged aren't shared, but their nodes are
+        transformed = expression.transform(
+            lambda n: exp.Literal.number(3) if isinstance(n, exp.Literal) and n.this == "2" else n,
+            persistent=True,
+        )
+        self.assertIsNot(transformed.args["expressions"], expression.args["expressions"])
+        self.assertIs(transformed.args["expressions"][0], expression.args["expressions"][0])
+        transformed.args["expressions"].append(exp.Literal.number(4))
+        self.assertEqual(expression.sql(), original_sql)
+
+        # the result can be edited once its shared subtrees are made private
+        transformed = expression.transform(fun, persistent=True).unshare()
+        self.assertIsNot(transformed.args["where"], expression.args["where"])
+        self.assertIsNot(transformed.args["expressions"][0], expression.args["expressions"][0])
+        self.assertIs(transformed.find(exp.Where).parent, transformed)
+        transformed.find(exp.Where).set("this", parse_one("d > 3"))
+        transformed.find(exp.Column).replace(parse_one("e"))
+        self.assertEqual(transformed.sql(), "SELECT e, b + 10 FROM x WHERE d > 3")
+        self.assertEqual(transformed, parse_one("SELECT e, b + 10 FROM x WHERE d > 3"))
+        self.assertEqual(expression.sql(), original_sql)
+        self.assertEqual(expression, parse_one(original_sql))
+
     def test_transform_no_infinite_recursion(self):
         expression = parse_one("a")
 
@@ -272,3 +473,212 @@ class TestExpressions(unittest.TestCase):
             expression.sql(),
             "SELECT replaced_col1, replaced_col2 FROM table1"
         )
+
+    def test_builder(self):
+        expression = (
+            exp.select("a", "x.b", "SUM(c) AS d")
+            .from_("db.x")
+            .join("y", on="x.a = y.a", side="left")
+            .join("JOIN z ON z.a = x.a CROSS JOIN w")
+            .where("x.b > 1")
+            .where("a = 1 OR b = 2")
+        )
+        self.assertEqual(
+            expression.sql(),
+            "SELECT a, x.b, SUM(c) AS d FROM db.x LEFT JOIN y ON x.a = y.a "
+            "JOIN z ON z.a = x.a CROSS JOIN w WHERE x.b > 1 AND (a = 1 OR b = 2)",
+        )
+        self.assertEqual(expression, parse_one(expression.sql()))
+        self.assertEqual(hash(expression), hash(parse_one(expression.sql())))
+        self.assertEqual(exp.select("a"), parse_one("SELECT a"))
+        self.assertEqual(exp.select("a").from_("x"), parse_one("SELECT a FROM x"))
+        self.assertEqual(
+            expression.args["expressions"][1],
+            parse_one("SELECT x.b").args["expressions"][0],
+        )
+
+        for node, parent, key in expression.walk():
+            if isinstance(node, exp.Expression) and parent:
+                self.assertIs(node.parent, parent)
+                self.assertEqual(node.arg_key, key)
+
+        column = exp.Column(this=exp.Identifier(this="e", quoted=False))
+        self.assertIs(exp.select(column).args["expressions"][0], column)
+        self.assertEqual(exp.select("*").from_("x", "y AS z").sql(), "SELECT * FROM x, y AS z")
+        self.assertEqual(exp.select("`a`", dialect="hive").sql(), 'SELECT "a"')
+        self.assertEqual(exp.or_("a = 1", "b = 2").sql(), "a = 1 OR b = 2")
+
+        with self.assertRaises(ValueError):
+            exp.select("a").join("JOIN y", on="x.a = y.a")
+        with self.assertRaises(ValueError):
+            exp.select(1)
+        with self.assertRaises(ValueError):
+            exp.select("a").from_()
+        with self.assertRaises(ValueError):
+            exp.and_()
+
+    def test_args_view(self):
+        expression = parse_one("SELECT a FROM x")
+        column = expression.find(exp.Column)
+
+        self.assertFalse(hasattr(column, "__dict__"))
+        self.assertEqual(exp.Column.key, "column")
+        self.assertEqual(column.key, "column")
+        self.assertEqual(dict(column.args), {"this": column.this})
+        self.assertNotIn("table", column.args)
+        self.assertIsNone(column.args.get("table"))
+        for key in ("table", "missing"):
+            with self.assertRaises(KeyError):
+                column.args[key]  # pylint: disable=pointless-statement
+
+        hash(expression)
+        column.args["table"] = exp.Identifier(this="x", quoted=False)
+        self.assertIsNone(expression._hash)  # pylint: disable=protected-access
+        self.assertEqual(list(column.args), ["this", "table"])
+        self.assertEqual(expression.sql(), "SELECT x.a FROM x")
+        self.assertEqual(column.args.pop("table").this, "x")
+        self.assertIsNone(column.args.pop("table", None))
+        with self.assertRaises(KeyError):
+            column.args.pop("table")
+        self.assertEqual(column.args.get(key="table", default="y"), "y")
+        self.assertEqual(column.args.setdefault("fields", []), [])
+        del column.args["fields"]
+        self.assertEqual(expression.sql(), "SELECT a FROM x")
+
+        extra = exp.Column(this="a", comment="b")
+        self.assertEqual(extra.args, {"this": "a", "comment": "b"})
+        self.assertEqual(extra.copy().args, extra.args)
+        self.assertEqual(exp.Column(this="a", table=None), exp.Column(this="a"))
+
+    def test_weak_parents(self):
+        exp.set_weak_parents()
+        self.addCleanup(exp.set_weak_parents, False)
+
+        expression = parse_one("SELECT x(1) FROM y")
+        literal = expression.find(exp.Literal)
+        self.assertIs(literal.parent.parent, expression)
+        self.assertEqual(literal.depth, 2)
+        copy = expression.copy()
+        self.assertIs(copy.find(exp.Literal).parent.parent, copy)
+        self.assertIsNone(copy.parent)
+
+        transformed = expression.transform(
+            lambda n: exp.Literal.number(2) if isinstance(n, exp.Literal) else n
+        )
+        self.assertEqual(transformed.find(exp.Literal).depth, 2)
+        self.assertEqual(
+            transpile(
+                "CREATE TABLE x (w STRING) PARTITIONED BY (y INT, z INT)",
+                read="hive",
+                write="presto",
+            )[0],
+            "CREATE TABLE x (w VARCHAR, y INTEGER, z INTEGER) WITH (PARTITIONED_BY = ARRAY['y', 'z'])",
+        )
+
+        gc.disable()
+        self.addCleanup(gc.enable)
+        root = weakref.ref(expression)
+        del expression, literal
+        self.assertIsNone(root())
+
+        # a subtree which outlives its root loses its parent
+        self.assertIsNone(parse_one("SELECT x FROM y").find(exp.Column).parent)
+
+        # the parent links are rebuilt when unpickled
+        expression = parse_one("SELECT x(1), y FROM z")
+        unpickled = pickle.loads(pickle.dumps(expression))
+        self.assertEqual(unpickled, expression)
+        self.assertEqual(unpickled.sql(), "SELECT x(1), y FROM z")
+        literal = unpickled.find(exp.Literal)
+        self.assertIs(literal.parent.parent, unpickled)
+        self.assertEqual((literal.arg_key, literal.arg_index), ("expressions", 0))
+        self.assertEqual(unpickled.find(exp.Column).arg_index, 1)
+        subtree = pickle.loads(pickle.dumps(expression.find(exp.UserFunction)))
+        self.assertIsNone(subtree.parent)
+
+    def test_intern(self):
+        first = parse_one("SELECT a, CAST(b AS INT) FROM x", intern=True)
+        second = parse_one("SELECT A, CAST(b AS INT) FROM y", intern=True)
+
+        cast = first.find(exp.Cast)
+        self.assertIs(cast, second.find(exp.Cast))
+        self.assertIsNot(first.find(exp.Column), second.find(exp.Column))
+        self.assertTrue(cast.shared)
+        self.assertIsNone(cast.parent)
+        self.assertFalse(first.shared)
+        with self.assertRaises(ValueError):
+            cast.set("this", exp.Literal.number(1))
+        with self.assertRaises(ValueError):
+            cast.args["to"] = None
+
+        self.assertEqual(first.sql(), "SELECT a, CAST(b AS INT) FROM x")
+        self.assertEqual(first.copy().sql(), first.sql())
+        self.assertFalse(first.copy().find(exp.Cast).shared)
+        transformed = first.transform(
+            lambda n: exp.Literal.number(1) if isinstance(n, exp.Column) and n.text("this") == "b" else n
+        )
+        self.assertEqual(transformed.sql(), "SELECT a, CAST(1 AS INT) FROM x")
+        self.assertEqual(second.sql(), "SELECT A, CAST(b AS INT) FROM y")
+
+        first_copy, second_copy = pickle.loads(pickle.dumps((first, second)))
+        self.assertEqual(first_copy, first)
+        self.assertFalse(first_copy.shared)
+        self.assertTrue(first_copy.find(exp.Cast).shared)
+        self.assertIsNone(first_copy.find(exp.Cast).parent)
+        self.assertIs(first_copy.find(exp.Cast), second_copy.find(exp.Cast))
+        self.assertIs(first_copy.find(exp.From).parent, first_copy)
+
+        first.unshare()
+        self.assertFalse(any(n.shared for n in first.find_all(exp.Expression)))
+        self.assertIs(first.find(exp.Cast).parent, first)
+        self.assertIs(second.find(exp.Cast), cast)
+
+        interner = exp.Interner()
+        tree = parse_one("SELECT a FROM x", intern=interner)
+        self.assertGreater(len(interner), 0)
+        self.assertIs(parse_one("SELECT a FROM x", intern=interner).find(exp.Column), tree.find(exp.Column))
+        self.assertIsNot(parse_one("SELECT a FROM x", intern=True).find(exp.Column), tree.find(exp.Column))
+
+        # the interner doesn't keep the shared nodes alive
+        del tree
+        gc.collect()
+        self.assertEqual(len(interner), 0)
+
+    def test_replace(self):
+        expression = parse_one("SELECT a, b, c FROM x WHERE y > 1").enable_index()
+        self.assertEqual(len(list(expression.find_all(exp.Column))), 4)
+
+        columns = expression.args["expressions"]
+        self.assertEqual([c.arg_index for c in columns], [0, 1, 2])
+        self.assertIsNone(expression.args["where"].arg_index)
+
+        b = columns[1]
+        new = parse_one("SELECT d + 1").args["expressions"][0]
+        self.assertIs(b.replace(new), new)
+        self.assertEqual(expression.sql(), "SELECT a, d + 1, c FROM x WHERE y > 1")
+        self.assertIs(new.parent, expression)
+        self.assertEqual((new.arg_key, new.arg_index), ("expressions", 1))
+        self.assertIsNone(b.parent)
+        self.assertIn(new.find(exp.Column), expression.find_all(exp.Column))
+        self.assertNotIn(b, expression.find_all(exp.Column))
+
+        a = columns[0]
+        self.assertIs(a.pop(), a)
+        self.assertEqual(expression.sql(), "SELECT d + 1, c FROM x WHERE y > 1")
+        self.assertEqual([c.arg_index for c in columns], [0, 1])
+        self.assertIsNone(a.parent)
+
+        expression.find(exp.Where).pop()
+        self.assertEqual(expression.sql(), "SELECT d + 1, c FROM x")
+        self.assertEqual(hash(expression), hash(parse_one("SELECT d + 1, c FROM x")))
+        self.assertEqual(len(list(expression.find_all(exp.Column))), 2)
+
+        # lists which were modified directly are searched
+        columns.insert(0, exp.Star())
+        columns[2].replace(exp.Literal.number(1))
+        self.assertEqual(expression.sql(), "SELECT *, d + 1, 1 FROM x")
+
+        literal = exp.Literal.number(2)
+        self.assertEqual(literal.replace(exp.Literal.number(3)).this, "3")
+        with self.assertRaises(ValueError):
+            parse_one("SELECT a FROM x", intern=True).find(exp.Column).replace(None)
@@ -0,0 +1,58 @@
+import unittest
+
+from sqlglot import fingerprint, parse_one
+
+
+class TestFingerprints(unittest.TestCase):
+    def test_normalize(self):
+        for sql, expected in [
+            (
+                "select * from X where y in (1, 2, 3) and z = 'a'",
+                "SELECT * FROM x WHERE y IN (?) AND z = ?",
+            ),
+            (
+                "SELECT a - 1, -1, F(-2.5), b = -3 FROM x",
+                "SELECT a - ?, ?, f(?), b = ? FROM x",
+            ),
+            (
+                "SELECT \"Q\".b, COUNT(*), CAST(a AS INT) FROM t WHERE d IS NULL AND e = TRUE",
+                'SELECT "Q".b, COUNT(*), CAST(a AS INT) FROM t WHERE d IS ? AND e = ?',
+            ),
+            (
+                "SELECT a FROM x WHERE b IN (-1, 'x', NULL) OR c NOT IN (1) OR d IN (SELECT 1, 2)",
+                "SELECT a FROM x WHERE b IN (?) OR NOT c IN (?) OR d IN (SELECT ?, ?)",
+            ),
+            ("SELECT a FROM x WHERE b = ? -- comment", "SELECT a FROM x WHERE b = ?"),
+            ("SELECT x[1], y FROM z", "SELECT x[?], y FROM z"),
+        ]:
+            with self.subTest(sql):
+                self.assertEqual(fingerprint(sql).sql, expected)
+
+    def test_hash(self):
+        first = fingerprint("SELECT a FROM x WHERE b IN (1, 2) AND c = 'x'")
+        second = fingerprint("select A from X where B in (3)  and c='y'")
+        tree = fingerprint(parse_one("SELECT a FROM x WHERE b IN (4, 5, 6) AND c = 'z'"))
+
+        self.assertEqual(first, second)
+        self.assertEqual(first, tree)
+
+        # strings and trees are both fingerprinted through the generated SQL
+        sql = "SELECT a FROM (SELECT b FROM y) x WHERE c = 1"
+        self.assertEqual(fingerprint(sql), fingerprint(parse_one(sql)))
+        self.assertEqual(fingerprint(sql), fingerprint(parse_one(sql).sql()))
+        self.assertEqual(fingerprint(parse_one(sql)), fingerprint(parse_one(sql.replace("1", "2"))))
+        self.assertNotEqual(first.hash, fingerprint("SELECT a FROM x WHERE b IN (1, 2)").hash)
+        self.assertNotEqual(first.hash, fingerprint('SELECT "A" FROM x WHERE b IN (1) AND c = 1').hash)
+
+        # the hash is stable across processes and versions
+        self.assertEqual(fingerprint("SELECT a FROM x WHERE b = 1").hash, 0xF4E3E929E6C1DB8A)
+        self.assertLess(first.hash, 1 << 64)
+        self.assertGreater(fingerprint("SELECT 1", bits=128).hash, 1 << 64)
+        with self.assertRaises(ValueError):
+            fingerprint("SELECT 1", bits=32)
+
+    def test_dialect(self):
+        self.assertEqual(
+            fingerprint("SELECT `a` FROM x WHERE b = 1", read="spark").sql,
+            'SELECT "a" FROM x WHERE b = ?',
+        )
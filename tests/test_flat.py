@@ -0,0 +1,69 @@
+import unittest
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+import sqlglot.expressions as exp
+from sqlglot import parse_one
+from sqlglot.flat import FlatTree, StringTable
+
+
+@unittest.skipIf(np is None, "requires numpy")
+class TestFlatTree(unittest.TestCase):
+    def test_round_trip(self):
+        for sql in [
+            "SELECT a, b + 1 AS c FROM x WHERE d IN (1, 2) AND e IS NULL",
+            "SELECT CAST(a AS DECIMAL(10, 2)), COUNT(DISTINCT b) FROM y GROUP BY a ORDER BY 1 DESC",
+            "INSERT OVERWRITE TABLE a.b PARTITION(ds='YYYY-MM-DD') SELECT x FROM y",
+            "CREATE TABLE z (a INT, b VARCHAR) STORED AS PARQUET",
+            "WITH q AS (SELECT 1) SELECT * FROM q UNION ALL SELECT TRUE",
+        ]:
+            expression = parse_one(sql, read="hive")
+            flat = FlatTree.from_expression(expression)
+            self.assertEqual(len(flat), sum(1 for _ in expression.find_all(exp.Expression)))
+
+            tree = flat.to_expression()
+            self.assertEqual(tree, expression)
+            self.assertEqual(tree.sql("hive"), expression.sql("hive"))
+
+            for node, parent, key in tree.walk():
+                if isinstance(node, exp.Expression) and node is not tree:
+                    self.assertIs(node.parent, parent)
+                    self.assertEqual(node.arg_key, key)
+
+    def test_layout(self):
+        flat = FlatTree.from_expression(parse_one("SELECT a, f(b) FROM x"))
+        self.assertEqual(flat.parents[0], -1)
+        self.assertEqual(flat.ends[0], len(flat))
+        self.assertEqual(flat.kinds[0], exp.Select.class_id)
+
+        children = flat.children[flat.child_offsets[0] : flat.child_offsets[1]]
+        self.assertEqual(
+            [flat.strings[k] for k in flat.arg_keys[children]],
+            ["expressions", "expressions", "from"],
+        )
+        self.assertTrue(all(flat.parents[c] == 0 for c in children))
+
+    def test_queries(self):
+        strings = StringTable()
+        flat = FlatTree.from_expression(
+            parse_one("SELECT a, SUM(b) FROM x WHERE c > 1 AND d = (SELECT MAX(e) FROM y)"),
+            strings=strings,
+        )
+
+        columns = flat.find_all(exp.Column)
+        self.assertEqual(len(columns), 5)
+        identifiers = [
+            flat.children[flat.child_offsets[i]]
+            for i in flat.find_all(exp.Column, under=exp.Where)
+        ]
+        self.assertEqual([flat.text(i) for i in identifiers], ["c", "d", "e"])
+        self.assertEqual(len(flat.find_all(exp.AggFunc)), 2)
+        self.assertEqual(len(flat.find_all(exp.Column, under=exp.AggFunc)), 2)
+        self.assertEqual(flat.counts()[exp.Column], 5)
+
+        other = FlatTree.from_expression(parse_one("SELECT a FROM x"), strings=strings)
+        self.assertEqual(len(strings), len(set(strings.strings)))
+        self.assertEqual(other.to_expression().sql(), "SELECT a FROM x")
@@ -1,6 +1,10 @@
+import io
 import unittest
 
+import sqlglot.expressions as exp
+from sqlglot import parse_one
 from sqlglot.expressions import Func
+from sqlglot.generator import Generator, share_memo
 from sqlglot.parser import Parser
 from sqlglot.tokens import Tokenizer
 
@@ -28,3 +32,175 @@ class TestGenerator(unittest.TestCase):
         )[0]
 
         self.assertEqual(expression.sql(), "SELECT SPECIAL_UDF(a, b, c, d + 1) FROM x")
+
+    def test_dispatch(self):
+        # pylint: disable=protected-access
+        expression = parse_one("SELECT a, 1 FROM x")
+        transforms = {exp.Literal: "?", exp.Column: lambda self, e: self.sql(e, "this").upper()}
+
+        self.assertEqual(Generator(transforms=transforms).generate(expression), "SELECT A, ? FROM x")
+        self.assertIs(
+            Generator(transforms=dict(transforms))._handlers,
+            Generator(transforms=transforms)._handlers,
+        )
+        self.assertEqual(Generator().generate(expression), "SELECT a, 1 FROM x")
+
+        class Quoting(Generator):
+            def identifier_sql(self, expression):
+                return f"[{expression.this}]"
+
+        self.assertEqual(Quoting().generate(expression), "SELECT [a], 1 FROM [x]")
+
+        class Custom(exp.Expression):
+            pass
+
+        with self.assertRaises(ValueError):
+            Generator().generate(exp.Select(expressions=[Custom(this="a")]))
+
+
+    def test_pretty_blocks(self):
+        expression = parse_one(
+            "SELECT a FROM x WHERE EXISTS (SELECT b FROM y WHERE c = 'd\ne' AND f IN (SELECT g FROM (SELECT 1) AS z))"
+        )
+        pretty = """SELECT
+  a
+FROM x
+WHERE
+  EXISTS (
+      SELECT
+        b
+      FROM y
+      WHERE
+        c = 'd
+e'
+        AND f IN (SELECT g FROM (SELECT 1) AS z)
+  )"""
+        # the lines of string literals are left as is
+        self.assertEqual(expression.sql(pretty=True), pretty)
+        self.assertEqual(parse_one(pretty), expression)
+
+        # blocks are only spliced by generate
+        generator = Generator(pretty=True)
+        exists = expression.find(exp.Exists)
+        self.assertEqual(generator.sql(exists), generator.generate(exists))
+        self.assertNotIn("\x00", generator.sql(exists))
+
+        # NUL characters in the text of the tree can't be mistaken for block markers
+        for sql in ["SELECT 'a\x000\x00b' FROM (SELECT 1) AS t", "SELECT 'a\x00' FROM (SELECT 1) AS t UNION SELECT 1"]:
+            expression = parse_one(sql)
+            pretty = expression.sql(pretty=True)
+            self.assertEqual(parse_one(pretty), expression)
+            self.assertEqual("".join(Generator(pretty=True).generate_iter(expression)), pretty)
+
+    def test_generate_iter(self):
+        for sql in [
+            "SELECT 1 UNION ALL SELECT 2 UNION SELECT 3 INTERSECT SELECT 4 EXCEPT SELECT 5",
+            "INSERT OVERWRITE TABLE x VALUES (1, 2.0, '3.0'), (4, (SELECT 5), '6.0')",
+            "WITH a AS (SELECT 1) SELECT * FROM a UNION ALL SELECT * FROM (SELECT 2) AS b",
+            "INSERT INTO x SELECT * FROM y WHERE EXISTS (SELECT 1) UNION ALL SELECT * FROM z",
+            "SELECT a FROM x",
+        ]:
+            expression = parse_one(sql)
+            for pretty in (False, True):
+                with self.subTest(sql=sql, pretty=pretty):
+                    generator = Generator(pretty=pretty)
+                    chunks = list(generator.generate_iter(expression))
+                    self.assertEqual("".join(chunks), generator.generate(expression))
+
+        self.assertEqual(
+            list(Generator().generate_iter(parse_one("INSERT INTO x VALUES (1), (2)"))),
+            ["INSERT INTO x", " VALUES", " (1), (2)"],
+        )
+
+        # customized expressions are generated in one chunk
+        generator = Generator(transforms={exp.Union: lambda self, e: "UNION"})
+        self.assertEqual(list(generator.generate_iter(parse_one("SELECT 1 UNION SELECT 2"))), ["UNION"])
+
+        # the chain is too deep to be generated recursively
+        union = parse_one("SELECT 0")
+        for i in range(1, 5000):
+            union = exp.Union(this=union, expression=parse_one(f"SELECT {i}"), distinct=True)
+        output = io.StringIO()
+        Generator().generate_to(union, output)
+        self.assertEqual(output.getvalue(), " UNION ".join(f"SELECT {i}" for i in range(5000)))
+
+    def test_memoize(self):
+        class Counting(Generator):
+            columns = 0
+
+            def column_sql(self, expression):
+                Counting.columns += 1
+                return super().column_sql(expression)
+
+        def generate(expression, **opts):
+            Counting.columns = 0
+            return Counting(memoize=True, **opts).generate(expression)
+
+        expression = parse_one("SELECT a, b FROM x WHERE c > 1 AND d IN (SELECT e FROM y)")
+        sql = expression.sql()
+        self.assertEqual(generate(expression), sql)
+        self.assertEqual(Counting.columns, 5)
+        self.assertEqual(generate(expression), sql)
+        self.assertEqual(Counting.columns, 0)
+
+        # only the modified path is generated again
+        expression.find(exp.GT).set("expression", exp.Literal.number(2))
+        self.assertEqual(generate(expression), sql.replace("c > 1", "c > 2"))
+        self.assertEqual(Counting.columns, 0)
+        expression.find(exp.Select).append("expressions", exp.Column(this=exp.Identifier(this="f")))
+        self.assertEqual(generate(expression), "SELECT a, b, f FROM x WHERE c > 2 AND d IN (SELECT e FROM y)")
+        self.assertEqual(Counting.columns, 1)
+        expression.find(exp.Column).replace(exp.Column(this=exp.Identifier(this="g")))
+        expression.transform(lambda n: exp.Literal.number(3) if isinstance(n, exp.Literal) else n, copy=False)
+        copy = expression.copy()
+        self.assertEqual(generate(copy), "SELECT g, b, f FROM x WHERE c > 3 AND d IN (SELECT e FROM y)")
+        self.assertEqual(Counting.columns, 1)
+
+        # the cache is keyed by the configuration and the layout
+        pretty = generate(copy, pretty=True)
+        self.assertEqual(pretty, copy.sql(pretty=True))
+        self.assertEqual(Counting.columns, 6)
+        self.assertEqual(generate(copy, pretty=True), pretty)
+        self.assertEqual(Counting.columns, 0)
+
+        # the nodes only keep the SQL of the last configuration
+        self.assertEqual(generate(copy, identify=True), copy.sql(identify=True))
+        self.assertEqual(Counting.columns, 6)
+
+        # a CASE formats its branches even where formatting is turned off, at the depth of
+        # the subquery which contains it
+        expression = parse_one(
+            "SELECT a FROM z WHERE a IN (SELECT b FROM (SELECT CASE WHEN x = 1 THEN 'a' ELSE 'b' END AS b FROM y) AS w)"
+        )
+        subquery = list(expression.find_all(exp.Select))[-1]
+        generator = Generator(pretty=True, memoize=True)
+        for node in (subquery, expression, subquery):
+            self.assertEqual(generator.generate(node), node.sql(pretty=True))
+
+    def test_share_memo(self):
+        class Counting(Generator):
+            columns = 0
+
+            def column_sql(self, expression):
+                Counting.columns += 1
+                return super().column_sql(expression)
+
+        expression = parse_one("""SELECT a + 1, CAST(b AS INT), "c" FROM x WHERE d = 'e'""")
+        generators = share_memo(
+            [
+                Counting(),
+                Counting(type_mapping={exp.DataType.Type.INT: "INTEGER"}, identifier="`"),
+                Counting(quote='"', transforms={exp.Cast: lambda self, e: f"CAST({self.sql(e, 'this')})"}),
+            ]
+        )
+
+        self.assertEqual(
+            [generator.generate(expression) for generator in generators],
+            [
+                """SELECT a + 1, CAST(b AS INT), "c" FROM x WHERE d = 'e'""",
+                "SELECT a + 1, CAST(b AS INTEGER), `c` FROM x WHERE d = 'e'",
+                'SELECT a + 1, CAST(b), "c" FROM x WHERE d = "e"',
+            ],
+        )
+        # a, b and d are generated once, the quoted c by every generator
+        self.assertEqual(Counting.columns, 6)
@@ -214,3 +214,36 @@ class TestRewriter(unittest.TestCase):
             ).expression.sql("hive"),
             "SELECT * FROM x JOIN z ON x.col1 = z.col1 CROSS JOIN y ON x.col1 = y.col1 WHERE col1 > 5",
         )
+
+    def test_batch(self):
+        expression = parse_one("SELECT a FROM x WHERE col1 > 5")
+        batch = Rewriter(expression).batch()
+
+        self.assertIs(batch.add_selects("b"), batch)
+        self.assertIs(batch.add_where("AND", "col2 = 1").add_join("JOIN y ON x.a = y.a"), batch)
+        self.assertEqual(
+            batch.ctas("t").commit().sql(),
+            "CREATE TABLE t AS SELECT a, b FROM x JOIN y ON x.a = y.a WHERE col2 = 1 AND col1 > 5",
+        )
+        self.assertEqual(expression.sql(), "SELECT a FROM x WHERE col1 > 5")
+
+        with self.assertRaises(ValueError):
+            batch.add_selects("c")
+        with self.assertRaises(ValueError):
+            batch.commit()
+        with self.assertRaises(ValueError):
+            Rewriter(expression).commit()
+
+        # every batch works on its own copy, the rewriter and its expression are never edited
+        rewriter = Rewriter(expression)
+        first = rewriter.batch().add_selects("b")
+        second = rewriter.batch().add_selects("c")
+        self.assertEqual(first.commit().sql(), "SELECT a, b FROM x WHERE col1 > 5")
+        self.assertEqual(second.commit().sql(), "SELECT a, c FROM x WHERE col1 > 5")
+        self.assertEqual(rewriter.expression.sql(), "SELECT a FROM x WHERE col1 > 5")
+
+        batch = Rewriter(expression, copy=False).batch()
+        self.assertIsNot(batch.expression, expression)
+        committed = batch.add_selects("c").commit()
+        self.assertEqual(committed.sql(), "SELECT a, c FROM x WHERE col1 > 5")
+        self.assertEqual(expression.sql(), "SELECT a FROM x WHERE col1 > 5")
@@ -0,0 +1,120 @@
+import unittest
+
+import sqlglot.expressions as exp
+from sqlglot import parse_one
+from sqlglot.rules import ANY, Capture, Pattern, Rule, RuleSet
+
+
+def unwrap(_node, inner):
+    return inner
+
+
+def to_str(_node, column):
+    return exp.Anonymous(this="TO_STR", expressions=[column])
+
+
+def swap(node):
+    # 1 = a -> a = 1
+    return exp.EQ(this=node.args["expression"], expression=node.this)
+
+
+VARCHAR_CAST = Pattern(
+    exp.Cast,
+    this=Capture("column", exp.Column),
+    to=Pattern(exp.DataType, this=exp.DataType.Type.VARCHAR),
+)
+PAREN = Pattern(exp.Paren, this=Capture("inner", (exp.Column, exp.Literal, exp.Paren)))
+LITERAL_FIRST = Pattern(exp.EQ, this=exp.Literal, expression=exp.Column)
+
+
+class TestRules(unittest.TestCase):
+    def test_match(self):
+        rules = RuleSet(Rule(VARCHAR_CAST, to_str))
+
+        self.assertEqual(
+            rules.apply(
+                parse_one("SELECT CAST(a AS VARCHAR), CAST(b AS INT), CAST(1 AS VARCHAR) FROM x")
+            ).sql(),
+            "SELECT TO_STR(a), CAST(b AS INT), CAST(1 AS VARCHAR) FROM x",
+        )
+
+        def is_upper(value):
+            return value.isupper()
+
+        for pattern, sql, matches in [
+            (Pattern(exp.Column, table=None), "SELECT a, x.b FROM x", 1),
+            (Pattern(exp.Column, table=ANY), "SELECT a, x.b FROM x", 2),
+            (Pattern(exp.Identifier, this=is_upper), "SELECT A, b FROM x", 1),
+            (Pattern(exp.Identifier, this="b"), "SELECT A, b FROM x", 1),
+            (Pattern(exp.UserFunction, expressions=[exp.Column, exp.Literal]), "SELECT F(a, 1), F(a)", 1),
+            ((exp.Literal, exp.Star), "SELECT *, 1, a", 2),
+        ]:
+            with self.subTest(pattern):
+                changes = {}
+                RuleSet(Rule(pattern, lambda node: exp.Null(), name="null")).apply(
+                    parse_one(sql), changes=changes
+                )
+                self.assertEqual(changes.get("null", 0), matches)
+
+    def test_dispatch(self):
+        rules = RuleSet()
+        cast = rules.add(VARCHAR_CAST, to_str)
+        paren = rules.add(PAREN, unwrap)
+        anything = rules.add(Capture("x"), lambda node, x: None, name="anything")
+
+        self.assertEqual(rules.rules_for(exp.Cast), (cast, anything))
+        self.assertEqual(rules.rules_for(exp.Paren), (paren, anything))
+        self.assertEqual(rules.rules_for(exp.Column), (anything,))
+        self.assertEqual(len(rules), 3)
+
+    def test_fixpoint(self):
+        rules = RuleSet()
+        rules.rule(LITERAL_FIRST)(swap)
+        rules.rule(PAREN)(unwrap)
+
+        @rules.rule(Pattern(exp.Where, this=Capture("column", exp.Column)))
+        def truthy(_node, column):
+            # builds a node that the swap rule rewrites in the next pass
+            return exp.Where(this=exp.EQ(this=exp.Literal.number(1), expression=column))
+
+        sql = "SELECT ((a)) FROM x WHERE (b)"
+        self.assertEqual(rules.apply(parse_one(sql)).sql(), "SELECT a FROM x WHERE 1 = b")
+
+        changes = {}
+        self.assertEqual(
+            rules.apply(parse_one(sql), fixpoint=True, changes=changes).sql(),
+            "SELECT a FROM x WHERE b = 1",
+        )
+        self.assertEqual(changes, {"unwrap": 3, "swap": 1, "truthy": 1})
+
+        with self.assertRaises(ValueError):
+            RuleSet(Rule(exp.EQ, swap)).apply(parse_one("SELECT 1 = a"), fixpoint=True, max_passes=5)
+
+    def test_in_place(self):
+        rules = RuleSet(Rule(VARCHAR_CAST, to_str), Rule(PAREN, unwrap))
+
+        sql = "SELECT CAST(a AS VARCHAR), (b) FROM x"
+        expression = parse_one(sql).enable_index()
+        copy = expression.copy()
+        hash(expression)
+        self.assertEqual(len(list(expression.find_all(exp.Cast))), 1)
+        self.assertIs(rules.apply(expression, copy=False), expression)
+        self.assertEqual(expression.sql(), "SELECT TO_STR(a), b FROM x")
+        self.assertEqual(list(expression.find_all(exp.Cast)), [])
+        self.assertEqual(hash(expression), hash(rules.apply(parse_one(sql))))
+        self.assertEqual(copy.sql(), "SELECT CAST(a AS VARCHAR), (b) FROM x")
+
+        for i, projection in enumerate(expression.args["expressions"]):
+            self.assertIs(projection.parent, expression)
+            self.assertEqual(projection.arg_index, i)
+
+        # the root of a subtree is replaced in its parent
+        paren = parse_one("SELECT (c) FROM x").find(exp.Paren)
+        column = rules.apply(paren, copy=False)
+        self.assertEqual(column.parent.sql(), "SELECT c FROM x")
+
+        shared = parse_one("SELECT CAST(a AS VARCHAR), CAST(a AS VARCHAR) FROM x", intern=True)
+        other = parse_one("SELECT CAST(a AS VARCHAR) FROM y", intern=True)
+        rules.apply(shared, copy=False)
+        self.assertEqual(shared.sql(), "SELECT TO_STR(a), TO_STR(a) FROM x")
+        self.assertEqual(other.sql(), "SELECT CAST(a AS VARCHAR) FROM y")
@@ -0,0 +1,72 @@
+import unittest
+
+import sqlglot.expressions as exp
+from sqlglot import parse_one
+from sqlglot.serde import dump, load
+
+
+class TestSerDe(unittest.TestCase):
+    SQL = [
+        "SELECT a, b + 1 AS c FROM x WHERE d IN (1, 2) AND e IS NULL",
+        "SELECT CAST(a AS DECIMAL(10, 2)), COUNT(DISTINCT b) FROM y GROUP BY a ORDER BY 1 DESC",
+        "INSERT OVERWRITE TABLE a.b PARTITION(ds='YYYY-MM-DD', x) SELECT 'ü' FROM y",
+        "CREATE TABLE z (a INT, b ARRAY<VARCHAR>) STORED AS PARQUET",
+        "WITH q AS (SELECT 1) SELECT * FROM q UNION ALL SELECT TRUE",
+    ]
+
+    def assert_round_trip(self, expression, tree):
+        self.assertEqual(tree, expression)
+        self.assertEqual(tree.sql("hive"), expression.sql("hive"))
+        self.assertEqual(tree.to_s(), expression.to_s())
+
+        for node, parent, key in tree.walk():
+            if isinstance(node, exp.Expression) and node is not tree:
+                self.assertIs(node.parent, parent)
+                self.assertEqual(node.arg_key, key)
+
+    def test_binary(self):
+        for sql in self.SQL:
+            expression = parse_one(sql, read="hive")
+            data = expression.dump()
+            self.assertIsInstance(data, bytes)
+            self.assert_round_trip(expression, exp.Expression.load(data))
+
+    def test_json(self):
+        for sql in self.SQL:
+            expression = parse_one(sql, read="hive")
+            self.assert_round_trip(
+                expression, exp.Expression.load_json(expression.dump_json())
+            )
+
+    def test_values(self):
+        expression = exp.Anonymous(this="f", expressions=[(1, -300), 2**70, None, False])
+        self.assertEqual(load(dump(expression)).args, expression.args)
+
+    def test_deep(self):
+        expression = exp.Literal.number(1)
+        for _ in range(5000):
+            expression = exp.Neg(this=exp.Paren(this=expression))
+
+        tree = load(dump(expression))
+        nodes = list(tree.find_all(exp.Expression, bfs=False))
+        self.assertEqual(len(nodes), 10001)
+        self.assertEqual(list(map(type, nodes)), list(map(type, expression.find_all(exp.Expression, bfs=False))))
+        self.assertEqual(nodes[-1].this, "1")
+        self.assertIs(nodes[-1].parent, nodes[-2])
+        self.assertEqual(dump(tree), dump(expression))
+
+    def test_strings_deduplicated(self):
+        expression = parse_one("SELECT abcdefgh, abcdefgh + abcdefgh FROM abcdefgh")
+        self.assertEqual(dump(expression).count(b"abcdefgh"), 1)
+
+    def test_errors(self):
+        data = parse_one("SELECT 1").dump()
+
+        with self.assertRaises(ValueError):
+            load(b"XXXX" + data[4:])
+        with self.assertRaises(ValueError):
+            load(data[:4] + bytes([99]) + data[5:])
+        with self.assertRaises(ValueError):
+            load(data.replace(b"select", b"selecz"))
+        with self.assertRaises(ValueError):
+            dump(exp.Literal(this=1.5, is_string=False))
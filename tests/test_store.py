@@ -0,0 +1,69 @@
+import gc
+import os
+import tempfile
+import unittest
+import warnings
+
+import sqlglot.expressions as exp
+from sqlglot import parse_one
+from sqlglot.store import ASTStore
+
+
+class TestStore(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.path = os.path.join(self.dir.name, "queries.ast")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_append_get(self):
+        with ASTStore(self.path) as store:
+            store.append("q1", parse_one("SELECT a FROM x"))
+            store.append("q2", parse_one("SELECT SUM(b) FROM y WHERE c = 1"))
+            self.assertEqual(store.get("q1").sql(), "SELECT a FROM x")
+            store.append("q3", parse_one("SELECT 1"))
+            self.assertEqual(store.get("q3").sql(), "SELECT 1")
+            self.assertEqual(len(store), 3)
+
+            with self.assertRaises(KeyError):
+                store.get("q4")
+
+        with ASTStore(self.path) as store:
+            self.assertEqual(store.ids(), ["q1", "q2", "q3"])
+            self.assertEqual(store.get("q2").sql(), "SELECT SUM(b) FROM y WHERE c = 1")
+            store.append("q1", parse_one("SELECT z FROM x"))
+
+        os.remove(self.path + ".idx")
+
+        with ASTStore(self.path) as store:
+            self.assertEqual(store.ids(), ["q1", "q2", "q3"])
+            self.assertEqual(store.get("q1").sql(), "SELECT z FROM x")
+
+    def test_scan(self):
+        with ASTStore(self.path) as store:
+            store.append("q1", parse_one("SELECT a FROM x"))
+            store.append("q2", parse_one("SELECT SUM(b) FROM y WHERE c = 1"))
+            store.append("q3", parse_one("SELECT MAX(b) FROM y"))
+            store.append("q1", parse_one("SELECT a FROM x WHERE d"))
+
+            self.assertEqual([i for i, _ in store.scan()], ["q2", "q3", "q1"])
+            self.assertEqual([i for i, _ in store.scan(exp.Where)], ["q2", "q1"])
+            self.assertEqual([i for i, _ in store.scan(exp.AggFunc)], ["q2", "q3"])
+            self.assertEqual([i for i, _ in store.scan(exp.Join)], [])
+            self.assertEqual(
+                [e.sql() for _, e in store.scan(exp.Max)], ["SELECT MAX(b) FROM y"]
+            )
+
+    def test_invalid(self):
+        with open(self.path, "wb") as file:
+            file.write(b"nope")
+
+        # the warning of an unclosed file is raised when the file is collected, where it
+        # can't propagate as an error, so it's recorded instead
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always", ResourceWarning)
+            with self.assertRaises(ValueError):
+                ASTStore(self.path)
+            gc.collect()
+        self.assertEqual([str(w.message) for w in caught if w.category is ResourceWarning], [])
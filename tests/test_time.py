@@ -1,6 +1,6 @@
 import unittest
 
-from sqlglot.time import format_time
+from sqlglot.time import format_time, translator
 
 
 class TestTime(unittest.TestCase):
@@ -12,3 +12,21 @@ class TestTime(unittest.TestCase):
         self.assertEqual(format_time("aa", mapping), "c")
         self.assertEqual(format_time("aaada", mapping), "cbdb")
         self.assertEqual(format_time("da", mapping), "db")
+
+        # the longest element is replaced at every position
+        mapping = {"y": "%y", "yyyy": "%Y", "s": "%S"}
+        self.assertEqual(format_time("yyyyy", mapping), "%Y%y")
+        self.assertEqual(format_time("yyys", mapping), "%y%y%y%S")
+        self.assertEqual(format_time("%%Y", {"%Y": "yyyy"}), "%%Y")
+
+    def test_translator(self):
+        mapping = {"a": "b"}
+        compiled = translator(mapping)
+        self.assertIs(translator(mapping), compiled)
+        self.assertEqual(compiled.translate("aXa"), "bXb")
+        self.assertEqual(compiled.translate.cache_info().currsize, 1)
+
+        # a mapping which is modified is compiled again
+        mapping["X"] = "Y"
+        self.assertIsNot(translator(mapping), compiled)
+        self.assertEqual(format_time("aXa", mapping), "bYb")
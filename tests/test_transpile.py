@@ -1,8 +1,12 @@
 # pylint: disable=too-many-statements
 import os
+import subprocess
+import sys
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 from unittest import mock
 
+import sqlglot
 from sqlglot import ErrorLevel, ParseError, parse_one, transpile, expressions as exp
 
 
@@ -252,6 +256,53 @@ class TestTranspile(unittest.TestCase):
             for sql in f:
                 self.assertEqual(transpile(sql)[0], sql.strip())
 
+    @mock.patch("sqlglot.helper.logger")
+    def test_multiple_targets(self, _mock_logger):
+        targets = ["presto", "spark", "hive", "duckdb", "sqlite"]
+
+        with open(
+            os.path.join(self.fixtures_dir, "identity.sql"), encoding="utf-8"
+        ) as f:
+            for sql in f:
+                with self.subTest(sql):
+                    opts = {"unsupported_level": ErrorLevel.IGNORE}
+                    self.assertEqual(
+                        transpile(sql, write=targets, **opts),
+                        {w: transpile(sql, write=w, **opts) for w in targets},
+                    )
+
+        self.assertEqual(
+            transpile("SELECT CAST(a AS TEXT), x[0] FROM x; SELECT 1", write=("hive", "presto")),
+            {
+                "hive": ["SELECT CAST(a AS STRING), x[0] FROM x", "SELECT 1"],
+                "presto": ["SELECT CAST(a AS VARCHAR), x[1] FROM x", "SELECT 1"],
+            },
+        )
+
+    @mock.patch("sqlglot.helper.logger")
+    def test_transpiler(self, _mock_logger):
+        with open(
+            os.path.join(self.fixtures_dir, "identity.sql"), encoding="utf-8"
+        ) as f:
+            sqls = f.read().splitlines() * 2
+
+        for read, write in [(None, None), ("presto", "spark"), (None, "hive")]:
+            with self.subTest(f"{read} -> {write}"):
+                transpiler = sqlglot.Transpiler(read, write, unsupported_level=ErrorLevel.IGNORE)
+                with ThreadPoolExecutor(max_workers=8) as pool:
+                    self.assertEqual(
+                        list(pool.map(transpiler.transpile, sqls)),
+                        [
+                            transpile(sql, read, write, unsupported_level=ErrorLevel.IGNORE)
+                            for sql in sqls
+                        ],
+                    )
+
+        transpiler = sqlglot.Transpiler(write="presto", pretty=True)
+        with self.assertRaises(ParseError):
+            transpiler.transpile("1 + (2 + 3")
+        self.assertEqual(transpiler.transpile("SELECT x[0] FROM y"), ["SELECT\n  x[1]\nFROM y"])
+
     def test_partial(self):
         with open(
             os.path.join(self.fixtures_dir, "partial.sql"), encoding="utf-8"
@@ -284,3 +335,17 @@ class TestTranspile(unittest.TestCase):
 
         with self.assertRaises(ParseError):
             transpile("x + 1 (")
+
+    def test_lazy_import(self):
+        code = (
+            "import sys, sqlglot\n"
+            "assert 'sqlglot.dialects' not in sys.modules\n"
+            "assert 'inspect' not in sys.modules\n"
+            "assert sqlglot.transpile('SELECT 1', write='hive') == ['SELECT 1']\n"
+            "assert sqlglot.Dialect is sys.modules['sqlglot.dialects'].Dialect\n"
+            "assert 'inspect' not in sys.modules\n"
+        )
+        subprocess.run([sys.executable, "-c", code], check=True)
+
+        with self.assertRaises(AttributeError):
+            sqlglot.missing  # pylint: disable=pointless-statement